@@ -0,0 +1,79 @@
+"""
+Throughput benchmark for the heuristic keyword checks: the previous
+per-keyword substring scans vs the compiled KeywordMatcher used by
+RelevanceClassifierAgent and UpgradeStatusAgent.
+
+Event texts are taken from the `Text:` lines of a sample file, padded to
+`--chars` characters like a scraped article, and repeated up to `--events`.
+
+    python -m src.analysis.bench_keywords [test_urls.txt] [--events 5000] [--chars 4000]
+"""
+import time
+import argparse
+from datetime import datetime
+from typing import Callable, List
+from src.models import RawEvent
+from src.analysis.relevance import RelevanceClassifierAgent
+from src.analysis.status import UpgradeStatusAgent
+
+def load_texts(path: str) -> List[str]:
+    with open(path, "r") as f:
+        return [line.strip()[len("Text:"):].strip() for line in f if line.strip().startswith("Text:")]
+
+def substring_scan(relevance: RelevanceClassifierAgent, status: UpgradeStatusAgent) -> Callable[[RawEvent], None]:
+    # The previous implementation: one `in` scan per keyword and list
+    keyword_lists = [
+        [k.rstrip("*") for k in relevance.crypto_keywords],
+        [k.rstrip("*") for k in relevance.economic_keywords],
+        [k.rstrip("*") for k in relevance.upgrade_keywords],
+        [k.rstrip("*") for k in status.deployed_keywords],
+        [k.rstrip("*") for k in status.approved_keywords],
+    ]
+    def run(event: RawEvent):
+        text_lower = event.text.lower()
+        for keywords in keyword_lists:
+            any(k in text_lower for k in keywords)
+    return run
+
+def compiled_scan(relevance: RelevanceClassifierAgent, status: UpgradeStatusAgent) -> Callable[[RawEvent], None]:
+    def run(event: RawEvent):
+        relevance.classify(event)
+        status.determine_status(event)
+    return run
+
+def throughput(fn: Callable[[RawEvent], None], events: List[RawEvent]) -> float:
+    start = time.perf_counter()
+    for event in events:
+        fn(event)
+    return len(events) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("text_file", nargs="?", default="test_urls.txt")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--chars", type=int, default=4000)
+    args = parser.parse_args()
+
+    texts = load_texts(args.text_file)
+    if not texts:
+        print(f"No 'Text:' lines found in {args.text_file}")
+        return
+    filler = " ".join(texts)
+    events = []
+    for i in range(args.events):
+        text = texts[i % len(texts)]
+        text = (text + "\n\n" + filler * (args.chars // max(len(filler), 1) + 1))[:args.chars]
+        events.append(RawEvent(project="uniswap", source_type="Blog", author="", text=text, url="", timestamp=datetime.now()))
+
+    relevance = RelevanceClassifierAgent()
+    status = UpgradeStatusAgent()
+    # The substring scans are the lower bound of the old cost: they stop at the first hit of each
+    # list and skip building signals and statuses, but can't report positions or word boundaries
+    baseline = throughput(substring_scan(relevance, status), events)
+    compiled = throughput(compiled_scan(relevance, status), events)
+    print(f"{len(events)} events of {args.chars} chars")
+    print(f"  substring scans:  {baseline:,.0f} events/sec")
+    print(f"  compiled matcher: {compiled:,.0f} events/sec (relevance + status, {compiled / baseline:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import random
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Set
+from src.models import RawEvent, RelevanceSignal, AffectedSubtype
+from src.ingestion.http_cache import cache_dir
+
+URL_PATTERN = re.compile(r'https?://\S+')
+NON_WORD = re.compile(r'[^a-z0-9]+')
+
+SHINGLE_SIZE = 3
+# MinHash signature: NUM_PERM values split into BANDS bands of ROWS values for LSH.
+# With 16 x 4, pairs above ~0.6 Jaccard similarity almost always share a band, pairs below ~0.3 rarely do.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures are persisted, so the permutations must be the same in every run
+_rng = random.Random(1)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+# Shorter texts don't have enough shingles for a stable signature; only exact URL matches apply
+MIN_TOKENS = 12
+
+def normalize(text: str) -> List[str]:
+    return NON_WORD.sub(" ", URL_PATTERN.sub(" ", text.lower())).split()
+
+def shingles(tokens: List[str]) -> Set[int]:
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(tokens[i:i + SHINGLE_SIZE]).encode(), digest_size=8).digest(), "big")
+        for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))
+    }
+
+def minhash(shingle_hashes: Set[int]) -> List[int]:
+    """
+    MinHash signature; the fraction of equal positions between two
+    signatures estimates the Jaccard similarity of their shingle sets.
+    """
+    return [
+        min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in shingle_hashes)
+        for a, b in PERMUTATIONS
+    ]
+
+def band_keys(signature: List[int]) -> List[int]:
+    keys = []
+    for band in range(BANDS):
+        rows = array("I", signature[band * ROWS:(band + 1) * ROWS]).tobytes()
+        # Signed 64-bit so it fits an SQLite integer
+        keys.append(int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), "big", signed=True))
+    return keys
+
+def similarity(a: List[int], b: List[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+class NearDuplicateIndex:
+    """
+    Persistent index of already-classified events, used to skip relevance
+    classification for reposts: the same announcement as a blog post and a
+    GitHub release note, or a sitemap lastmod bump re-emitting an old post.
+
+    Events match on the same URL with unchanged text, or on the
+    MinHash-estimated Jaccard similarity of their normalized text (same
+    project only). Signatures are
+    stored with one indexed key per LSH band, so a lookup only compares
+    against the few entries sharing a band instead of the whole history.
+    Oldest entries are evicted beyond `max_entries`.
+    """
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None, threshold: Optional[float] = None):
+        self.path = path or os.path.join(cache_dir(), "dedup.sqlite")
+        self.max_entries = max_entries or int(os.getenv("DEDUP_MAX_ENTRIES", "50000"))
+        self.threshold = threshold or float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project TEXT,
+                url TEXT,
+                signature BLOB,
+                content_hash TEXT,
+                is_relevant INTEGER,
+                subtypes TEXT,
+                upgrade_id TEXT,
+                created_at REAL
+            )
+        """)
+        # Indexes created by older versions lack the content hash; their rows only match by similarity
+        if "content_hash" not in {row[1] for row in self.conn.execute("PRAGMA table_info(docs)")}:
+            self.conn.execute("ALTER TABLE docs ADD COLUMN content_hash TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS docs_url ON docs (project, url)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS bands (
+                project TEXT,
+                band INTEGER,
+                key INTEGER,
+                doc_id INTEGER
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS bands_lookup ON bands (project, band, key)")
+        self.conn.commit()
+        self.count = self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.batch_hits = 0
+
+    def _signature(self, event: RawEvent) -> Optional[List[int]]:
+        tokens = normalize(event.text)
+        return minhash(shingles(tokens)) if len(tokens) >= MIN_TOKENS else None
+
+    def _content_hash(self, event: RawEvent) -> str:
+        return hashlib.sha256(" ".join(normalize(event.text)).encode()).hexdigest()
+
+    def _row(self, cur: sqlite3.Cursor, row) -> Dict[str, Any]:
+        doc = dict(zip([c[0] for c in cur.description], row))
+        doc["subtypes"] = json.loads(doc["subtypes"] or "[]")
+        return doc
+
+    def lookup(self, event: RawEvent) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored entry this event duplicates, or None.
+        """
+        signature = self._signature(event)
+        with self.lock:
+            if event.url:
+                # An edited post keeps its URL; only reuse the verdict if the text is the same
+                cur = self.conn.execute(
+                    "SELECT * FROM docs WHERE project = ? AND url = ? AND content_hash = ? ORDER BY id DESC LIMIT 1",
+                    (event.project, event.url, self._content_hash(event))
+                )
+                row = cur.fetchone()
+                if row:
+                    self.hits += 1
+                    return self._row(cur, row)
+
+            if signature is not None:
+                # One index probe per band
+                probes = " UNION ".join("SELECT doc_id FROM bands WHERE project = ? AND band = ? AND key = ?" for _ in range(BANDS))
+                params: List[Any] = []
+                for band, key in enumerate(band_keys(signature)):
+                    params += [event.project, band, key]
+                cur = self.conn.execute(f"SELECT * FROM docs WHERE id IN ({probes}) ORDER BY id DESC", params)
+                best, best_score = None, self.threshold
+                for row in cur.fetchall():
+                    doc = self._row(cur, row)
+                    score = similarity(signature, list(array("I", doc["signature"])))
+                    if score >= best_score:
+                        best, best_score = doc, score
+                if best:
+                    self.hits += 1
+                    return best
+            self.misses += 1
+            return None
+
+    def batch_duplicates(self, events: List[RawEvent]) -> List[Optional[int]]:
+        """
+        For each event, the position of an earlier event in `events` it
+        duplicates, or None. Catches reposts that arrive in the same batch,
+        before either copy is in the index.
+        """
+        firsts: List[tuple] = []
+        matches: List[Optional[int]] = []
+        for i, event in enumerate(events):
+            content_hash = self._content_hash(event)
+            signature = self._signature(event)
+            match = None
+            for j, other, other_hash, other_signature in firsts:
+                if other.project != event.project:
+                    continue
+                same_url = event.url and event.url == other.url and content_hash == other_hash
+                if same_url or (signature is not None and other_signature is not None and similarity(signature, other_signature) >= self.threshold):
+                    match = j
+                    break
+            matches.append(match)
+            if match is None:
+                firsts.append((i, event, content_hash, signature))
+        with self.lock:
+            self.batch_hits += sum(1 for m in matches if m is not None)
+        return matches
+
+    def add(self, event: RawEvent, signals: RelevanceSignal, upgrade_id: Optional[str] = None):
+        signature = self._signature(event)
+        subtypes = json.dumps([s.model_dump() for s in signals.affected_subtypes])
+        blob = array("I", signature).tobytes() if signature is not None else None
+        with self.lock:
+            cur = self.conn.execute(
+                "INSERT INTO docs (project, url, signature, content_hash, is_relevant, subtypes, upgrade_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (event.project, event.url, blob, self._content_hash(event), int(signals.is_relevant), subtypes, upgrade_id, time.time())
+            )
+            if signature is not None:
+                self.conn.executemany(
+                    "INSERT INTO bands (project, band, key, doc_id) VALUES (?, ?, ?, ?)",
+                    [(event.project, band, key, cur.lastrowid) for band, key in enumerate(band_keys(signature))]
+                )
+            self.count += 1
+            # Evict in batches rather than on every insert
+            if self.count > self.max_entries * 1.1:
+                self.conn.execute("""
+                    DELETE FROM docs WHERE id IN (
+                        SELECT id FROM docs ORDER BY id DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+                self.conn.execute("DELETE FROM bands WHERE doc_id < (SELECT MIN(id) FROM docs)")
+                self.count = self.max_entries
+            self.conn.commit()
+
+    def link(self, urls: List[str], project: str, upgrade_id: str):
+        """
+        Remembers which stored upgrade these events ended up in, so later
+        duplicates can be attached to it as supporting sources.
+        """
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE docs SET upgrade_id = ? WHERE project = ? AND url = ?",
+                [(upgrade_id, project, url) for url in urls]
+            )
+            self.conn.commit()
+
+    def signals_for(self, doc: Dict[str, Any]) -> RelevanceSignal:
+        return RelevanceSignal(
+            is_relevant=bool(doc["is_relevant"]),
+            affected_subtypes=[AffectedSubtype(**s) for s in doc["subtypes"]]
+        )
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        return f"[Dedup] {self.hits}/{total} events matched an already-classified event, {self.batch_hits} more an earlier event of the same batch"
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.batch_hits = 0
@@ -0,0 +1,76 @@
+"""
+Offline evaluation of the cascade relevance gate.
+
+Scores every event of a labelled sample with the keyword heuristic and, for
+each threshold, reports how many LLM calls the gate would save and how much
+recall it would cost (relevant events rejected before reaching the LLM).
+
+The sample is JSONL, one event per line:
+
+    {"text": "What is Slippage?: ...", "relevant": false, "project": "uniswap", "url": "..."}
+
+Only `text` and `relevant` are required; labels typically come from past LLM
+verdicts or manual review. Events are scored with their project's registry
+keywords and tokens, as in the pipeline.
+
+    python -m src.analysis.eval_relevance labelled.jsonl [--thresholds 0.1,0.2,0.3,0.45] [--registry source_registry.yaml]
+"""
+import sys
+import json
+import argparse
+import yaml
+from datetime import datetime
+from typing import List, Tuple
+from src.models import RawEvent, SourceRegistry
+from src.analysis.relevance import RelevanceClassifierAgent
+
+def load_sample(path: str) -> List[Tuple[RawEvent, bool]]:
+    sample = []
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            event = RawEvent(
+                project=row.get("project", "unknown"),
+                source_type=row.get("source_type", "Blog"),
+                author=row.get("author") or "",
+                text=row["text"],
+                url=row.get("url", ""),
+                timestamp=datetime.now()
+            )
+            sample.append((event, bool(row["relevant"])))
+    return sample
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sample", help="labelled JSONL sample")
+    parser.add_argument("--thresholds", default="0.1,0.2,0.3,0.45,0.6")
+    parser.add_argument("--registry", default="source_registry.yaml", help="source registry with per-project keywords")
+    parser.add_argument("--show-misses", action="store_true", help="list relevant events rejected at each threshold")
+    args = parser.parse_args()
+
+    sample = load_sample(args.sample)
+    if not sample:
+        print(f"No labelled events in {args.sample}")
+        sys.exit(1)
+    with open(args.registry, "r") as f:
+        registry = SourceRegistry(**yaml.safe_load(f))
+    gate = RelevanceClassifierAgent()
+    scored = [(gate.score(event, project_config=registry.projects.get(event.project)), relevant, event) for event, relevant in sample]
+    positives = sum(1 for _, relevant, _ in scored if relevant)
+    print(f"{len(scored)} events, {positives} labelled relevant")
+    print(f"{'threshold':>9}  {'LLM calls saved':>15}  {'recall loss':>11}  {'missed':>6}")
+
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        rejected = [(relevant, event) for score, relevant, event in scored if score < threshold]
+        missed = [event for relevant, event in rejected if relevant]
+        saved = len(rejected) / len(scored) * 100
+        recall_loss = (len(missed) / positives * 100) if positives else 0.0
+        print(f"{threshold:>9.2f}  {saved:>14.0f}%  {recall_loss:>10.1f}%  {len(missed):>6}")
+        if args.show_misses:
+            for event in missed:
+                print(f"           - {event.url or event.text[:80]}")
+
+if __name__ == "__main__":
+    main()
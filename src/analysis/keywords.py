@@ -0,0 +1,102 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+WORD_CHAR = "a-z0-9"
+# Sentence boundary used to limit how far back tense/negation checks look
+SENTENCE_BREAK = re.compile(r'[.!?\n]')
+
+class Hit(NamedTuple):
+    keyword: str
+    category: str
+    start: int
+    end: int
+
+def _pattern(keyword: str) -> str:
+    """
+    Regex for one keyword, without the leading word boundary (the matcher
+    applies it once for all keywords). Plain keywords match whole words plus
+    a plural "s"/"es", so "l1" no longer matches inside "html1" and "live"
+    not inside "deliver". A trailing "*" makes it a prefix: "deploy*" matches
+    "deploys", "deployed" and "deployment".
+    """
+    prefix = keyword.endswith("*")
+    keyword = keyword.rstrip("*")
+    body = r'\s+'.join(re.escape(part) for part in keyword.split())
+    if prefix:
+        return body + rf'[{WORD_CHAR}\-]*'
+    end = rf'(?:e?s)?(?![{WORD_CHAR}])' if keyword[-1:].isalnum() else ""
+    return body + end
+
+class KeywordMatcher:
+    """
+    All keyword lists compiled into one alternation regex, so a text is
+    scanned once instead of once per keyword. `find` returns every hit with
+    its category and position; callers use the positions for context checks
+    such as tense ("will be live") or negation.
+    """
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.groups = {category: list(dict.fromkeys(k.lower() for k in keywords)) for category, keywords in groups.items()}
+        self.keyword_category: Dict[str, List[str]] = {}
+        for category, keywords in self.groups.items():
+            for k in keywords:
+                self.keyword_category.setdefault(k, []).append(category)
+        # Matched text -> keywords, resolved only for the (few) hits
+        self.exact = {k: k for k in self.keyword_category if not k.endswith("*")}
+        self.prefixes = [(k.rstrip("*"), k) for k in self.keyword_category if k.endswith("*")]
+        self.resolved: Dict[str, List[Tuple[str, str]]] = {}
+
+        # Longest first, so "governance pass" wins over "pass" at the same position.
+        # No capture groups in the branches: sre can then skip a branch on its first literal.
+        keywords = sorted(self.keyword_category, key=len, reverse=True)
+        self.regex = re.compile(rf'(?<![{WORD_CHAR}])(?:' + "|".join(_pattern(k) for k in keywords) + ")") if keywords else None
+
+    def _resolve(self, matched: str) -> List[Tuple[str, str]]:
+        """
+        (keyword, category) pairs for a matched string, memoized: the same
+        few words ("token", "fees") make up most hits.
+        """
+        resolved = self.resolved.get(matched)
+        if resolved is None:
+            text = " ".join(matched.split())
+            found = [self.exact[m] for m in (text, text[:-1], text[:-2]) if m in self.exact]
+            found += [k for stem, k in self.prefixes if text.startswith(stem)]
+            resolved = [(k, category) for k in dict.fromkeys(found) for category in self.keyword_category[k]]
+            if len(self.resolved) < 10000:
+                self.resolved[matched] = resolved
+        return resolved
+
+    def find(self, text: str) -> List[Hit]:
+        if self.regex is None:
+            return []
+        return [
+            Hit(keyword, category, match.start(), match.end())
+            for match in self.regex.finditer(text.lower())
+            for keyword, category in self._resolve(match.group())
+        ]
+
+    def by_category(self, text: str) -> Dict[str, List[Hit]]:
+        found: Dict[str, List[Hit]] = {category: [] for category in self.groups}
+        for hit in self.find(text):
+            found[hit.category].append(hit)
+        return found
+
+    def extended(self, extra: Optional[Dict[str, Iterable[str]]]) -> "KeywordMatcher":
+        """
+        A new matcher with `extra` keywords added to (or creating) categories,
+        e.g. the per-project `keywords` from the source registry.
+        """
+        if not extra:
+            return self
+        groups = {category: list(keywords) for category, keywords in self.groups.items()}
+        for category, keywords in extra.items():
+            groups.setdefault(category, []).extend(keywords)
+        return KeywordMatcher(groups)
+
+def preceding_clause(text: str, hit: Hit, max_chars: int = 60) -> str:
+    """
+    Lower-cased text before a hit, up to `max_chars` and back to the start
+    of its sentence.
+    """
+    window = text[max(0, hit.start - max_chars):hit.start].lower()
+    breaks = list(SENTENCE_BREAK.finditer(window))
+    return window[breaks[-1].end():] if breaks else window
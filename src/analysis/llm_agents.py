@@ -1,13 +1,40 @@
 import os
 import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
 from google.genai.errors import APIError
-from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from src.models import RawEvent, RelevanceSignal, UpgradeConfirmation, Evidence, SourceType, AffectedSubtype, ProjectConfig
+from src.analysis.llm_cache import LLMCache
+from src.analysis.llm_executor import LLMExecutor
+from src.analysis.llm_telemetry import LLMTelemetry
+from src.analysis.snippets import SnippetSelector
+from src.analysis.verdict_log import VerdictLog
+
+class ContextCacheGone(Exception):
+    """
+    The context cache a request referenced no longer exists. The executor
+    repeats the attempt (counted against RPM/TPM) with the instructions inline.
+    """
 
 class GeminiAgent:
-    def __init__(self):
+    # Bump when the prompt template changes so cached answers aren't reused
+    PROMPT_VERSION = "2"
+
+    # Room left for the answer when estimating a request's token cost
+    OUTPUT_TOKEN_ALLOWANCE = 1000
+
+    # Static instructions shared by every call of the agent. They are uploaded once as a Gemini
+    # context cache (refreshed every LLM_CONTEXT_CACHE_TTL) and referenced by name; if caching
+    # is off or unavailable they are sent as the system instruction, a stable prefix that
+    # Gemini's implicit caching can still reuse.
+    SYSTEM_INSTRUCTION = ""
+    # Gemini rejects context caches below a minimum size (estimated at ~4 characters per token)
+    CONTEXT_CACHE_MIN_TOKENS = 1024
+
+    def __init__(self, cache: Optional[LLMCache] = None, executor: Optional[LLMExecutor] = None, telemetry: Optional[LLMTelemetry] = None, snippets: Optional[SnippetSelector] = None):
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
@@ -16,26 +43,153 @@ class GeminiAgent:
         self.client = genai.Client(api_key=api_key)
         # Using gemini-2.0-flash
         self.model_name = 'gemini-3.1-flash-lite-preview'
+        self.cache = cache or LLMCache()
+        # Shared pool and RPM/TPM limits; retries back off per request
+        self.executor = executor or LLMExecutor()
+        # Latency, retries and token usage per call, summarized once per cycle
+        self.telemetry = telemetry or LLMTelemetry()
+        # Decides which part of each event's text goes into the prompt
+        self.snippets = snippets or SnippetSelector()
+        self.context_cache_enabled = os.getenv("LLM_CONTEXT_CACHE", "1") != "0"
+        self.context_cache_ttl = int(os.getenv("LLM_CONTEXT_CACHE_TTL", "3600"))
+        self.context_cache: Optional[str] = None
+        self.context_cache_expires = 0.0
+        self.context_lock = threading.Lock()
+
+    def _context_cache_name(self) -> Optional[str]:
+        """
+        Name of a live context cache holding SYSTEM_INSTRUCTION, creating or
+        extending it when needed. None means: send the instruction inline.
+        """
+        if not self.context_cache_enabled or len(self.SYSTEM_INSTRUCTION) // 4 < self.CONTEXT_CACHE_MIN_TOKENS:
+            return None
+        with self.context_lock:
+            now = time.time()
+            # Refresh a little early so no request references a cache that expires in flight
+            if self.context_cache and now < self.context_cache_expires - 60:
+                return self.context_cache
+            ttl = f"{self.context_cache_ttl}s"
+            try:
+                if self.context_cache:
+                    try:
+                        self.client.caches.update(name=self.context_cache, config={'ttl': ttl})
+                    except APIError:
+                        # Already expired or deleted server-side; create a new one below
+                        self.context_cache = None
+                if not self.context_cache:
+                    cache = self.client.caches.create(
+                        model=self.model_name,
+                        config={
+                            'system_instruction': self.SYSTEM_INSTRUCTION,
+                            'display_name': f"{self.__class__.__name__}-v{self.PROMPT_VERSION}",
+                            'ttl': ttl
+                        }
+                    )
+                    self.context_cache = cache.name
+                    print(f"Created Gemini context cache for {self.__class__.__name__} ({self.context_cache_ttl}s TTL)")
+                self.context_cache_expires = now + self.context_cache_ttl
+                return self.context_cache
+            except Exception as e:
+                self.context_cache = None
+                if isinstance(e, APIError) and not self._retryable(e):
+                    # e.g. model without explicit caching support or instructions below the model's minimum
+                    print(f"Gemini context caching unavailable for {self.__class__.__name__} ({e}); sending instructions inline")
+                    self.context_cache_enabled = False
+                else:
+                    # Rate limit, server or network error: inline for this call, try again on the next one
+                    print(f"Could not create Gemini context cache for {self.__class__.__name__} ({e}); sending instructions inline for now")
+                return None
+
+    def _drop_context_cache(self, name: str):
+        with self.context_lock:
+            if self.context_cache == name:
+                self.context_cache = None
+
+    def _call_gemini(self, prompt: str, inline: bool = False):
+        config: Dict[str, Any] = {
+            'response_mime_type': 'application/json'
+        }
+        cache_name = None if inline else self._context_cache_name()
+        if cache_name:
+            config['cached_content'] = cache_name
+        elif self.SYSTEM_INSTRUCTION:
+            config['system_instruction'] = self.SYSTEM_INSTRUCTION
+        try:
+            return self.client.models.generate_content(model=self.model_name, contents=prompt, config=config)
+        except APIError as e:
+            if not cache_name or e.code not in (400, 403, 404):
+                raise
+            # The cache vanished before its expiry (deleted, or a clock mismatch); answer this one inline
+            self._drop_context_cache(cache_name)
+            raise ContextCacheGone(f"context cache {cache_name} rejected: {e}") from e
+
+    def _retryable(self, error: Exception) -> bool:
+        if isinstance(error, ContextCacheGone):
+            return True
+        # Rate limits and server errors are transient; other client errors won't succeed on retry
+        return isinstance(error, APIError) and (error.code == 429 or (error.code or 500) >= 500)
+
+    def _call_gemini_with_retry(self, prompt: str, attempts: List[int]):
+        inline = [False]
 
-    # Truncated exponential backoff: 2s, 4s, 8s, 16s, 32s (max 60s) for up to 6 attempts
-    @retry(
-        wait=wait_exponential(multiplier=2, min=2, max=60),
-        stop=stop_after_attempt(6),
-        retry=retry_if_exception_type(APIError)
-    )
-    def _call_gemini_with_retry(self, prompt: str):
-        return self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config={
-                'response_mime_type': 'application/json'
-            }
+        def attempt(prompt: str):
+            attempts[0] += 1
+            try:
+                return self._call_gemini(prompt, inline=inline[0])
+            except ContextCacheGone:
+                inline[0] = True
+                raise
+
+        return self.executor.call(
+            attempt, prompt,
+            # Cached instructions still count as input tokens towards the quota
+            tokens=(len(prompt) + len(self.SYSTEM_INSTRUCTION)) // 4 + self.OUTPUT_TOKEN_ALLOWANCE,
+            retryable=self._retryable
         )
 
-    def generate_json(self, prompt: str) -> dict:
+    def generate_json(self, prompt: str, cache_input: Any = None, project: Optional[str] = None) -> dict:
+        """
+        Returns the parsed JSON answer for `prompt`. `cache_input` is the
+        variable part of the prompt (event text, URLs, tokens); identical input
+        under the same model and PROMPT_VERSION is answered from the cache.
+        """
+        key = self._cache_key(cache_input if cache_input is not None else prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        data = self._generate_json(prompt, project)
+        self._cache_put(key, data)
+        return data
+
+    def _cache_get(self, key: str) -> Optional[dict]:
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.telemetry.record_cache_hit(self.__class__.__name__)
+        return cached
+
+    def _cache_key(self, cache_input: Any) -> str:
+        return self.cache.key(self.model_name, f"{self.__class__.__name__}:{self.PROMPT_VERSION}", cache_input)
+
+    def _cache_put(self, key: str, data: dict):
+        # Failed or empty answers are not cached, so they are retried next time
+        if data:
+            self.cache.put(key, self.model_name, f"{self.__class__.__name__}:{self.PROMPT_VERSION}", data)
+
+    def _generate_json(self, prompt: str, project: Optional[str] = None) -> dict:
+        return self._generate(prompt, project) or {}
+
+    def _generate(self, prompt: str, project: Optional[str] = None) -> Optional[dict]:
+        """
+        Like _generate_json, but returns None when the call itself failed
+        (after retries, e.g. quota exhausted) rather than an unusable answer.
+        """
+        attempts = [0]
+        start = time.monotonic()
+        response = None
         try:
-            # New SDK usage with tenacity retry wrapper
-            response = self._call_gemini_with_retry(prompt)
+            # Runs on the shared LLM executor (rate limits + per-request retries)
+            response = self._call_gemini_with_retry(prompt, attempts)
             # Extract the actual text from the first candidate's parts to avoid the thought_signature warning
             try:
                 text_content = ""
@@ -46,6 +200,7 @@ class GeminiAgent:
                 text_content = response.text
             
             data = json.loads(text_content)
+            self._record(project, start, attempts[0], response)
             if isinstance(data, list):
                 if data and isinstance(data[0], dict):
                     return data[0]
@@ -55,18 +210,31 @@ class GeminiAgent:
             return {}
         except Exception as e:
             print(f"Error generating JSON from Gemini ({self.model_name}): {e}")
-            return {}
+            # No response means the call itself failed; otherwise the answer wasn't valid JSON
+            self._record(project, start, attempts[0], response, ok=False, parse_ok=response is None, error=f"{type(e).__name__}: {e}"[:200])
+            return None if response is None else {}
+
+    def _record(self, project: Optional[str], start: float, attempts: int, response: Any, ok: bool = True, parse_ok: bool = True, error: Optional[str] = None):
+        self.telemetry.record(
+            self.__class__.__name__, project, time.monotonic() - start, attempts,
+            usage=getattr(response, "usage_metadata", None), ok=ok, parse_ok=parse_ok, error=error
+        )
 
 class LLMRelevanceAgent(GeminiAgent):
-    def classify(self, event: RawEvent, project_config: Optional[ProjectConfig] = None) -> RelevanceSignal:
-        token_context_str = ""
-        if project_config and project_config.relevant_tokens:
-            tokens = ", ".join(project_config.relevant_tokens)
-            token_context_str = f"Specifically, evaluate the impact against the native token(s) of this project: {tokens}. If the text describes general protocol enhancements but does NOT explicitly grant a new enforceable right, change supply, or directly impact the utility of {tokens}, it should NOT be considered relevant."
+    # Budget (estimated tokens) for the event texts packed into one classify_many request
+    BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "12000"))
+    BATCH_MAX_EVENTS = int(os.getenv("LLM_BATCH_MAX_EVENTS", "10"))
 
-        prompt = f"""
-        Analyze the following text from a crypto project source ({event.source_type.value}).
-        Determine if it explicitly impacts the EXISTENCE or STRENGTH of a **Tokenized Right**. 
+    def __init__(self, *args, verdicts: Optional[VerdictLog] = None, fallback: Any = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Fresh verdicts are logged as training data for the local classifier
+        self.verdicts = verdicts or VerdictLog()
+        # Relevance agent used when a Gemini call fails after all retries
+        self.fallback = fallback
+
+    # Static part of every relevance prompt, sent once per context-cache TTL instead of with every event
+    SYSTEM_INSTRUCTION = """
+        For each text you are given, determine if it explicitly impacts the EXISTENCE or STRENGTH of a **Tokenized Right**. 
         The article MUST describe a change to a cryptographically or socially enforceable right granted to the token holder.
         
         CRITICAL NEGATIVE CONSTRAINTS:
@@ -129,9 +297,54 @@ class LLMRelevanceAgent(GeminiAgent):
         AO-02 Off-Chain Asset: Right to transfer legal title or beneficial interest in a tokenised real-world asset.
 
         Ultimately, if it impacts one of these functionalities for a relevant token, then it's relevant.
+        """
+
+    def _token_context(self, project_config: Optional[ProjectConfig]) -> str:
+        if project_config and project_config.relevant_tokens:
+            tokens = ", ".join(project_config.relevant_tokens)
+            return f"Specifically, evaluate the impact against the native token(s) of this project: {tokens}. If the text describes general protocol enhancements but does NOT explicitly grant a new enforceable right, change supply, or directly impact the utility of {tokens}, it should NOT be considered relevant."
+        return ""
+
+    def _instructions(self, intro: str, token_context_str: str) -> str:
+        # The subtype cheat sheet is the (static) SYSTEM_INSTRUCTION; only the variable part goes in the prompt
+        return f"""
+        {intro}
         {token_context_str}
+        """
+
+    def _cache_input(self, event: RawEvent, project_config: Optional[ProjectConfig], text: str) -> dict:
+        return {
+            "source_type": event.source_type.value,
+            "text": text,
+            "url": event.url,
+            "tokens": project_config.relevant_tokens if project_config else [],
+        }
+
+    def _parse_signal(self, data: dict) -> RelevanceSignal:
+        affected_subtypes_data = data.get("affected_subtypes", [])
+        
+        parsed_subtypes = []
+        for subtype in affected_subtypes_data:
+            try:
+                parsed_subtypes.append(AffectedSubtype(**subtype))
+            except Exception as e:
+                print(f"Error parsing subtype: {e}")
+                continue
+                
+        is_relevant = data.get("is_relevant", len(parsed_subtypes) > 0)
+
+        return RelevanceSignal(
+            is_relevant=is_relevant,
+            affected_subtypes=parsed_subtypes
+        )
+
+    def classify(self, event: RawEvent, project_config: Optional[ProjectConfig] = None) -> RelevanceSignal:
+        return self._classify_text(event, self.snippets.select(event), project_config)
 
-        Text: "{event.text}"
+    def _classify_text(self, event: RawEvent, text: str, project_config: Optional[ProjectConfig]) -> RelevanceSignal:
+        intro = f"Analyze the following text from a crypto project source ({event.source_type.value})."
+        prompt = self._instructions(intro, self._token_context(project_config)) + f"""
+        Text: "{text}"
         Source: {event.url}
 
         Return JSON:
@@ -149,30 +362,129 @@ class LLMRelevanceAgent(GeminiAgent):
         }}
         """
         
-        data = self.generate_json(prompt)
-        
-        affected_subtypes_data = data.get("affected_subtypes", [])
-        
-        parsed_subtypes = []
-        for subtype in affected_subtypes_data:
-            try:
-                parsed_subtypes.append(AffectedSubtype(**subtype))
-            except Exception as e:
-                print(f"Error parsing subtype: {{e}}")
-                continue
-                
-        is_relevant = data.get("is_relevant", len(parsed_subtypes) > 0)
+        key = self._cache_key(self._cache_input(event, project_config, text))
+        data = self._cache_get(key)
+        if data is None:
+            data = self._generate(prompt, event.project)
+            if data is None and self.fallback:
+                # API unavailable (quota exhausted, outage): answer locally instead of "not relevant"
+                return self._provisional(self.fallback.classify(event, project_config=project_config))
+            if not data:
+                return self._provisional(self._parse_signal({}))
+            self._cache_put(key, data)
+            self.verdicts.add(event, text, data)
+        return self._parse_signal(data)
 
-        return RelevanceSignal(
-            is_relevant=is_relevant,
-            affected_subtypes=parsed_subtypes
+    def _provisional(self, signal: RelevanceSignal) -> RelevanceSignal:
+        signal.provisional = True
+        return signal
+
+    def classify_many(self, events: List[RawEvent], project_config: Optional[ProjectConfig] = None) -> List[Optional[RelevanceSignal]]:
+        """
+        Classifies several events of one project, packing as many as fit in
+        BATCH_TOKEN_BUDGET into each request so the instructions are sent once
+        per batch instead of once per event. Returns signals in input order;
+        None for events whose request failed outright when there is no fallback.
+        Each event is cached under the same key as `classify`.
+        """
+        results: List[Optional[RelevanceSignal]] = [None] * len(events)
+        # Main-content passages with the most signal, within the snippet budget
+        texts = [self.snippets.select(event) for event in events]
+        pending: List[int] = []
+        for i, event in enumerate(events):
+            cached = self._cache_get(self._cache_key(self._cache_input(event, project_config, texts[i])))
+            if cached is not None:
+                results[i] = self._parse_signal(cached)
+            else:
+                pending.append(i)
+
+        # Greedy packing by estimated tokens (~4 characters each)
+        batches: List[List[int]] = []
+        used = 0
+        for i in pending:
+            cost = len(texts[i]) // 4 + 50
+            if not batches or used + cost > self.BATCH_TOKEN_BUDGET or len(batches[-1]) >= self.BATCH_MAX_EVENTS:
+                batches.append([])
+                used = 0
+            batches[-1].append(i)
+            used += cost
+
+        # Batches run side by side; the shared executor decides how many calls are actually in flight
+        if len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=len(batches)) as pool:
+                list(pool.map(lambda batch: self._classify_batch(events, texts, batch, project_config, results), batches))
+        elif batches:
+            self._classify_batch(events, texts, batches[0], project_config, results)
+        return results
+
+    def _classify_batch(self, events: List[RawEvent], texts: List[str], batch: List[int], project_config: Optional[ProjectConfig], results: List[Optional[RelevanceSignal]]):
+        if len(batch) == 1:
+            results[batch[0]] = self._classify_text(events[batch[0]], texts[batch[0]], project_config)
+            return
+
+        listing = "\n\n".join(
+            f'[{n}] Source type: {events[i].source_type.value}\nSource: {events[i].url}\nText: "{texts[i]}"'
+            for n, i in enumerate(batch)
         )
+        intro = "Analyze each of the following texts from crypto project sources independently; each text is numbered [0], [1], ..."
+        prompt = self._instructions(intro, self._token_context(project_config)) + f"""
+        Texts:
+        {listing}
+
+        Return JSON with exactly one result per text, identified by its number:
+        {{
+            "results": [
+                {{
+                    "index": int,
+                    "is_relevant": bool,
+                    "affected_subtypes": [
+                {{
+                    "subtype_code": "The exact code from the cheat sheet (e.g., G-01, VD-02, SV-01)",
+                    "impact_type": "Creation | Removal | Strength Change | Parameter Tweak",
+                    "reason": "CRITICAL: You MUST explicitly quote the text that proves this. Then, explain the causal link of how that exact quote changes the enforceable rights or utility specifically for the token symbol listed in token_context. Do NOT hallucinate governance votes if the text does not explicitly mention them.",
+                    "confidence": float (0.0 to 1.0 indicating your certainty),
+                    "token_context": "The specific native token symbol affected (e.g., ETH, UNI)"
+                }}
+                    ]
+                }}
+            ]
+        }}
+        """
+
+        data = self._generate(prompt, events[batch[0]].project)
+        if data is None:
+            # The call failed outright (after retries); splitting would only repeat the failure per event
+            if not self.fallback:
+                return
+            if hasattr(self.fallback, "classify_many"):
+                signals = self.fallback.classify_many([events[i] for i in batch], project_config=project_config)
+            else:
+                signals = [self.fallback.classify(events[i], project_config=project_config) for i in batch]
+            for i, signal in zip(batch, signals):
+                results[i] = self._provisional(signal)
+            return
+        by_index = {}
+        for item in data.get("results", []) if isinstance(data.get("results"), list) else []:
+            if isinstance(item, dict) and isinstance(item.get("index"), int) and 0 <= item["index"] < len(batch):
+                by_index[item["index"]] = item
+
+        if len(by_index) < len(batch):
+            # Truncated or malformed answer: split the batch and try each half
+            print(f"Batch of {len(batch)} events returned {len(by_index)} usable results; splitting.")
+            mid = len(batch) // 2
+            self._classify_batch(events, texts, batch[:mid], project_config, results)
+            self._classify_batch(events, texts, batch[mid:], project_config, results)
+            return
+
+        for n, i in enumerate(batch):
+            item = {k: v for k, v in by_index[n].items() if k != "index"}
+            self._cache_put(self._cache_key(self._cache_input(events[i], project_config, texts[i])), item)
+            self.verdicts.add(events[i], texts[i], item)
+            results[i] = self._parse_signal(item)
 
 class LLMVerificationAgent(GeminiAgent):
-    def verify(self, events: List[RawEvent]) -> UpgradeConfirmation:
-        context_text = "\n\n".join([f"Source ({e.source_type.value}): {e.text} (URL: {e.url})" for e in events])
-        
-        prompt = f"""
+    # Protocol, rubric and answer format are the same for every cluster; only the evidence varies
+    SYSTEM_INSTRUCTION = """
         Analyze the provided evidence to determine if a specific cryptocurrency upgrade has been successfully deployed to MAINNET.
 
         ### Verification Protocol:
@@ -187,20 +499,26 @@ class LLMVerificationAgent(GeminiAgent):
         - **0.2 (Speculative):** Proposals, forum discussions, or roadmap mentions.
         - **0.0 (Irrelevant):** The text does not mention an upgrade.
 
-        Evidence:
-        {context_text}
-
         Return JSON:
-        {{
+        {
             "is_confirmed": bool, // ONLY true if score is 1.0
             "confidence": float,
             "status_detected": "string", // e.g., "Mainnet Live", "Testnet Only", "Proposal"
             "supporting_evidence": "quote the specific line confirming status",
             "reasoning": "brief explanation"
-        }}
+        }
+        """
+
+    def verify(self, events: List[RawEvent]) -> UpgradeConfirmation:
+        texts = [self.snippets.select(e) for e in events]
+        context_text = "\n\n".join([f"Source ({e.source_type.value}): {text} (URL: {e.url})" for e, text in zip(events, texts)])
+        
+        prompt = f"""
+        Evidence:
+        {context_text}
         """
         
-        data = self.generate_json(prompt)
+        data = self.generate_json(prompt, cache_input=[[e.source_type.value, text, e.url] for e, text in zip(events, texts)], project=events[0].project if events else None)
         
         evidence_list = [
             Evidence(type=e.source_type.value, url=e.url, description=e.text[:50])
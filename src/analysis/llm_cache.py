@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+from src.ingestion.http_cache import cache_dir
+
+def _normalize(value: Any) -> Any:
+    # Whitespace differences (re-indented prompts, re-scraped pages) shouldn't cause a miss
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+class LLMCache:
+    """
+    Disk-backed cache of parsed LLM responses.
+
+    Keys combine the model name, the agent's prompt-template version and a
+    hash of the normalized input, so changing the model or bumping a
+    PROMPT_VERSION invalidates old answers. Entries expire after `ttl`
+    seconds; least recently used ones are evicted beyond `max_entries`.
+    """
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = path or os.path.join(cache_dir(), "llm.sqlite")
+        self.ttl = ttl or float(os.getenv("LLM_CACHE_TTL_HOURS", "720")) * 3600
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                prompt_version TEXT,
+                response TEXT,
+                created_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, model: str, prompt_version: str, payload: Any) -> str:
+        normalized = json.dumps(_normalize(payload), sort_keys=True, default=str)
+        return hashlib.sha256(f"{model}\n{prompt_version}\n{normalized}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, prompt_version: str, response: Dict[str, Any]):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, prompt_version, response, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, prompt_version, json.dumps(response), now, now)
+            )
+            self.conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            # LRU eviction
+            self.conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.conn.commit()
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"[LLM Cache] {self.hits}/{total} LLM calls answered from cache ({rate:.0f}%)"
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
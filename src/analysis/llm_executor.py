@@ -0,0 +1,57 @@
+import os
+import time
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from src.rate_limit import TokenBucket
+
+class LLMExecutor:
+    """
+    Bounded thread pool for LLM API calls, shared by all agents.
+
+    Every attempt first takes one request from a requests-per-minute bucket
+    and its estimated tokens from a tokens-per-minute bucket, so throughput is
+    set by the quota rather than by round-trip latency. Retries back off per
+    request: a 429 on one call only delays that call, while the other workers
+    keep going within the shared limits.
+    """
+    def __init__(self, max_concurrency: Optional[int] = None, rpm: Optional[float] = None, tpm: Optional[float] = None, max_attempts: Optional[int] = None, base_delay: float = 2.0, max_delay: float = 60.0):
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        rpm = rpm or float(os.getenv("LLM_RPM", "60"))
+        tpm = tpm or float(os.getenv("LLM_TPM", "1000000"))
+        self.max_attempts = max_attempts or int(os.getenv("LLM_MAX_ATTEMPTS", "6"))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.requests = TokenBucket(rpm / 60.0, rpm)
+        self.tokens = TokenBucket(tpm / 60.0, tpm)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm")
+
+    def submit(self, fn: Callable[..., Any], *args, tokens: float = 0, retryable: Optional[Callable[[Exception], bool]] = None, **kwargs) -> Future:
+        """
+        Schedules `fn(*args, **kwargs)`. `tokens` is the estimated token cost
+        of one attempt; exceptions for which `retryable` returns True are
+        retried with jittered exponential backoff.
+        """
+        return self.pool.submit(self._run, fn, args, kwargs, tokens, retryable)
+
+    def call(self, fn: Callable[..., Any], *args, tokens: float = 0, retryable: Optional[Callable[[Exception], bool]] = None, **kwargs) -> Any:
+        return self.submit(fn, *args, tokens=tokens, retryable=retryable, **kwargs).result()
+
+    def _run(self, fn: Callable[..., Any], args: tuple, kwargs: dict, tokens: float, retryable: Optional[Callable[[Exception], bool]]) -> Any:
+        for attempt in range(1, self.max_attempts + 1):
+            self.requests.acquire(1)
+            # A single prompt larger than a minute's quota would never fit; let it through at the full quota
+            self.tokens.acquire(min(tokens, self.tokens.capacity))
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_attempts or not (retryable and retryable(e)):
+                    raise
+                # Truncated exponential backoff with jitter: ~2s, 4s, 8s, ... up to max_delay
+                delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+                delay = delay / 2 + random.uniform(0, delay / 2)
+                print(f"LLM call failed ({e}); retrying in {delay:.0f}s (attempt {attempt}/{self.max_attempts})")
+                time.sleep(delay)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Optional
+from src.ingestion.http_cache import cache_dir
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = [0.5, 1, 2, 4, 8, 16, 32, 64]
+
+class LLMCall(NamedTuple):
+    agent: str
+    project: str
+    # Including time spent waiting for the rate limiter and between retries
+    wall_time: float
+    attempts: int
+    prompt_tokens: int
+    cached_tokens: int
+    response_tokens: int
+    # False when the call failed after all retries or the answer wasn't valid JSON
+    ok: bool
+    parse_ok: bool
+    error: Optional[str]
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+class LLMTelemetry:
+    """
+    Per-call LLM metrics (latency, attempts, token usage from
+    `usage_metadata`, parse success), aggregated per agent and per project
+    once per cycle. `flush` appends the cycle's summary, with latency
+    histograms and percentiles, as one JSON line to LLM_METRICS_PATH so
+    latency and cost regressions show up across runs.
+
+    Cost is only estimated when prices are configured (USD per million
+    tokens: LLM_PRICE_INPUT, LLM_PRICE_CACHED, LLM_PRICE_OUTPUT).
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("LLM_METRICS_PATH") or os.path.join(cache_dir(), "llm_metrics.jsonl")
+        self.prices = {
+            "input": float(os.getenv("LLM_PRICE_INPUT", "0")),
+            "cached": float(os.getenv("LLM_PRICE_CACHED", "0")),
+            "output": float(os.getenv("LLM_PRICE_OUTPUT", "0")),
+        }
+        self.lock = threading.Lock()
+        self.calls: List[LLMCall] = []
+        # agent -> answers served by the response cache
+        self.cache_hits: Dict[str, int] = {}
+
+    def record(self, agent: str, project: Optional[str], wall_time: float, attempts: int, usage: Any = None, ok: bool = True, parse_ok: bool = True, error: Optional[str] = None):
+        call = LLMCall(
+            agent, project or "unknown", wall_time, attempts,
+            getattr(usage, "prompt_token_count", None) or 0,
+            getattr(usage, "cached_content_token_count", None) or 0,
+            (getattr(usage, "candidates_token_count", None) or 0) + (getattr(usage, "thoughts_token_count", None) or 0),
+            ok, parse_ok, error
+        )
+        with self.lock:
+            self.calls.append(call)
+
+    def record_cache_hit(self, agent: str):
+        with self.lock:
+            self.cache_hits[agent] = self.cache_hits.get(agent, 0) + 1
+
+    def _cost(self, prompt_tokens: int, cached_tokens: int, response_tokens: int) -> float:
+        # prompt_token_count includes the cached tokens, which are billed at the cached rate
+        return ((prompt_tokens - cached_tokens) * self.prices["input"]
+                + cached_tokens * self.prices["cached"]
+                + response_tokens * self.prices["output"]) / 1_000_000
+
+    def _summary(self, calls: List[LLMCall]) -> Dict[str, Any]:
+        latencies = [c.wall_time for c in calls]
+        histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        for latency in latencies:
+            histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        prompt = sum(c.prompt_tokens for c in calls)
+        cached = sum(c.cached_tokens for c in calls)
+        response = sum(c.response_tokens for c in calls)
+        summary = {
+            "calls": len(calls),
+            "failed": sum(1 for c in calls if not c.ok),
+            "parse_failures": sum(1 for c in calls if not c.parse_ok),
+            "retries": sum(c.attempts - 1 for c in calls),
+            "latency_p50": round(_percentile(latencies, 50), 3),
+            "latency_p90": round(_percentile(latencies, 90), 3),
+            "latency_p99": round(_percentile(latencies, 99), 3),
+            "latency_max": round(max(latencies, default=0.0), 3),
+            "latency_histogram": {f"<={b}s": n for b, n in zip(LATENCY_BUCKETS, histogram)} | {f">{LATENCY_BUCKETS[-1]}s": histogram[-1]},
+            "prompt_tokens": prompt,
+            "cached_tokens": cached,
+            "response_tokens": response,
+        }
+        if any(self.prices.values()):
+            summary["cost_usd"] = round(self._cost(prompt, cached, response), 6)
+        return summary
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            calls = list(self.calls)
+            cache_hits = dict(self.cache_hits)
+        by_agent: Dict[str, List[LLMCall]] = {}
+        by_project: Dict[str, List[LLMCall]] = {}
+        for c in calls:
+            by_agent.setdefault(c.agent, []).append(c)
+            by_project.setdefault(c.project, []).append(c)
+        return {
+            "timestamp": time.time(),
+            "total": self._summary(calls),
+            "cache_hits": cache_hits,
+            "by_agent": {agent: self._summary(cs) for agent, cs in by_agent.items()},
+            "by_project": {project: self._summary(cs) for project, cs in by_project.items()},
+            # Last few distinct errors, so a spike can be diagnosed from the metrics file alone
+            "errors": list(dict.fromkeys(c.error for c in calls if c.error))[-5:],
+        }
+
+    def report(self) -> str:
+        total = self.snapshot()["total"]
+        line = (f"[LLM] {total['calls']} calls, p50 {total['latency_p50']:.1f}s / p90 {total['latency_p90']:.1f}s, "
+                f"{total['retries']} retries, {total['failed']} failed, {total['parse_failures']} unparseable, "
+                f"{total['prompt_tokens']} prompt ({total['cached_tokens']} cached) / {total['response_tokens']} response tokens")
+        if "cost_usd" in total:
+            line += f", ~${total['cost_usd']:.4f}"
+        return line
+
+    def flush(self):
+        """
+        Appends this cycle's summary to the metrics file and starts a new cycle.
+        """
+        snapshot = self.snapshot()
+        if snapshot["total"]["calls"] or snapshot["cache_hits"]:
+            try:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(snapshot) + "\n")
+            except OSError as e:
+                print(f"Could not write LLM metrics to {self.path}: {e}")
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls = []
+            self.cache_hits = {}
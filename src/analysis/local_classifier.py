@@ -0,0 +1,281 @@
+"""
+Local relevance classifier trained on past Gemini verdicts.
+
+Hashed TF-IDF features (word unigrams and bigrams) with one logistic
+regression head for "relevant" and one per subtype family (SV, G, VD, M, P,
+C, AO), all computed with NumPy over whole batches. It runs without network
+access and is used when no GOOGLE_API_KEY is set, or when Gemini calls fail.
+
+Training data is the verdict log the Gemini relevance agent appends to
+(`.cache/relevance_verdicts.jsonl`). Labelled samples in the
+src.analysis.eval_relevance format work too. Training holds out a share of
+the records and reports agreement with the LLM next to the keyword heuristic:
+
+    python -m src.analysis.local_classifier [--log .cache/relevance_verdicts.jsonl] [--epochs 150]
+"""
+import os
+import re
+import json
+import time
+import zlib
+import argparse
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from src.models import RawEvent, RelevanceSignal, AffectedSubtype, ProjectConfig
+from src.ingestion.http_cache import cache_dir
+from src.analysis.snippets import SnippetSelector
+from src.analysis.verdict_log import read_verdicts
+
+FAMILIES = ["SV", "G", "VD", "M", "P", "C", "AO"]
+HEADS = ["relevant"] + FAMILIES
+# Hashed feature space; collisions are rare at this size for a few thousand posts
+NUM_FEATURES = 1 << 18
+TOKEN = re.compile(r'[a-z0-9](?:[a-z0-9\-.]*[a-z0-9])?')
+URL = re.compile(r'https?://\S+')
+
+def _default_path() -> str:
+    return os.getenv("LOCAL_CLASSIFIER_PATH") or os.path.join(cache_dir(), "local_classifier.npz")
+
+def hashed_counts(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sparse (row, feature, count) triples of hashed unigrams and bigrams, one
+    entry per distinct feature per text, sorted by row.
+    """
+    rows, cols = [], []
+    for r, text in enumerate(texts):
+        tokens = TOKEN.findall(URL.sub(" ", text.lower()))
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        hashes = np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.int64, count=len(grams))
+        rows.append(np.full(len(grams), r, dtype=np.int64))
+        cols.append(hashes & (NUM_FEATURES - 1))
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+    keys, counts = np.unique(np.concatenate(rows) * NUM_FEATURES + np.concatenate(cols), return_counts=True)
+    return keys // NUM_FEATURES, keys % NUM_FEATURES, counts.astype(np.float32)
+
+class LocalRelevanceClassifier:
+    """
+    Drop-in relevance agent (`classify` / `classify_many`) backed by a model
+    trained with `train`. `threshold` is the probability above which an
+    event counts as relevant (LOCAL_CLASSIFIER_THRESHOLD).
+    """
+    def __init__(self, threshold: Optional[float] = None, snippets: Optional[SnippetSelector] = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.5"))
+        # The verdict log holds the snippet text Gemini saw; classify the same view of each event
+        self.snippets = snippets or SnippetSelector()
+        self.weights = np.zeros((NUM_FEATURES, len(HEADS)), dtype=np.float32)
+        self.bias = np.zeros(len(HEADS), dtype=np.float32)
+        self.idf = np.ones(NUM_FEATURES, dtype=np.float32)
+        # Most common subtype code / impact type per family in the training data
+        self.family_codes: Dict[str, str] = {f: f"{f}-01" for f in FAMILIES}
+        self.family_impacts: Dict[str, str] = {f: "Parameter Tweak" for f in FAMILIES}
+        self.meta: Dict[str, Any] = {}
+
+    # --- Features ---
+
+    def _features(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows, cols, counts = hashed_counts(texts)
+        values = (1.0 + np.log(counts)) * self.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+        values = values / np.maximum(norms, 1e-12)[rows]
+        return rows, cols, values.astype(np.float32)
+
+    def _logits(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray, n: int) -> np.ndarray:
+        contributions = self.weights[cols] * values[:, None]
+        logits = np.empty((n, len(HEADS)), dtype=np.float32)
+        for k in range(len(HEADS)):
+            logits[:, k] = np.bincount(rows, weights=contributions[:, k], minlength=n)
+        return logits + self.bias
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """
+        (len(texts), len(HEADS)) probabilities; column 0 is "relevant".
+        """
+        rows, cols, values = self._features(texts)
+        return 1.0 / (1.0 + np.exp(-self._logits(rows, cols, values, len(texts))))
+
+    # --- Relevance agent interface ---
+
+    def _signal(self, probs: np.ndarray, project_config: Optional[ProjectConfig]) -> RelevanceSignal:
+        if probs[0] < self.threshold:
+            return RelevanceSignal(is_relevant=False, affected_subtypes=[])
+        families = [k for k in range(1, len(HEADS)) if probs[k] >= 0.5] or [int(np.argmax(probs[1:])) + 1]
+        tokens = ", ".join(project_config.relevant_tokens) if project_config else ""
+        return RelevanceSignal(
+            is_relevant=True,
+            affected_subtypes=[
+                AffectedSubtype(
+                    subtype_code=self.family_codes[HEADS[k]],
+                    impact_type=self.family_impacts[HEADS[k]],
+                    reason=f"Local model: {HEADS[k]} family (p={probs[k]:.2f})",
+                    confidence=round(float(probs[k] * probs[0]), 2),
+                    token_context=tokens
+                )
+                for k in families
+            ]
+        )
+
+    def classify(self, event: RawEvent, project_config: Optional[ProjectConfig] = None) -> RelevanceSignal:
+        return self.classify_many([event], project_config)[0]
+
+    def classify_many(self, events: List[RawEvent], project_config: Optional[ProjectConfig] = None) -> List[RelevanceSignal]:
+        if not events:
+            return []
+        probs = self.predict_proba([self.snippets.select(e) for e in events])
+        return [self._signal(p, project_config) for p in probs]
+
+    # --- Training ---
+
+    def train(self, texts: List[str], labels: np.ndarray, epochs: int = 150, learning_rate: float = 0.05, l2: float = 1e-6):
+        """
+        Fits idf and all heads with full-batch Adam on the logistic loss.
+        `labels` is (len(texts), len(HEADS)) of 0/1. Positives are up-weighted
+        per head so rare families still get learned.
+        """
+        n = len(texts)
+        rows, cols, counts = hashed_counts(texts)
+        document_frequency = np.bincount(cols, minlength=NUM_FEATURES)
+        self.idf = (np.log((1.0 + n) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        rows, cols, values = self._features(texts)
+
+        positives = labels.sum(axis=0)
+        positive_weight = np.clip((n - positives) / np.maximum(positives, 1), 1.0, 20.0)
+        sample_weight = np.where(labels > 0, positive_weight, 1.0).astype(np.float32)
+
+        self.weights = np.zeros((NUM_FEATURES, len(HEADS)), dtype=np.float32)
+        self.bias = np.zeros(len(HEADS), dtype=np.float32)
+        m_w, v_w = np.zeros_like(self.weights), np.zeros_like(self.weights)
+        m_b, v_b = np.zeros_like(self.bias), np.zeros_like(self.bias)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for step in range(1, epochs + 1):
+            probs = 1.0 / (1.0 + np.exp(-self._logits(rows, cols, values, n)))
+            error = (probs - labels) * sample_weight / n
+            grad_w = np.empty_like(self.weights)
+            for k in range(len(HEADS)):
+                grad_w[:, k] = np.bincount(cols, weights=values * error[rows, k], minlength=NUM_FEATURES)
+            grad_w += l2 * self.weights
+            grad_b = error.sum(axis=0)
+
+            m_w = beta1 * m_w + (1 - beta1) * grad_w
+            v_w = beta2 * v_w + (1 - beta2) * grad_w * grad_w
+            m_b = beta1 * m_b + (1 - beta1) * grad_b
+            v_b = beta2 * v_b + (1 - beta2) * grad_b * grad_b
+            correction = np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+            self.weights -= (learning_rate * correction * m_w / (np.sqrt(v_w) + eps)).astype(np.float32)
+            self.bias -= (learning_rate * correction * m_b / (np.sqrt(v_b) + eps)).astype(np.float32)
+
+    # --- Persistence ---
+
+    def save(self, path: Optional[str] = None):
+        path = path or _default_path()
+        meta = dict(self.meta, family_codes=self.family_codes, family_impacts=self.family_impacts, heads=HEADS, num_features=NUM_FEATURES)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, idf=self.idf, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, **kwargs) -> Optional["LocalRelevanceClassifier"]:
+        """
+        Loads a trained model, or returns None if there is none (or it was
+        trained with a different feature layout).
+        """
+        path = path or _default_path()
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("heads") != HEADS or meta.get("num_features") != NUM_FEATURES:
+                print(f"Ignoring local classifier at {path}: trained with a different feature layout")
+                return None
+            model = cls(**kwargs)
+            model.weights, model.bias, model.idf = data["weights"], data["bias"], data["idf"]
+        model.family_codes = meta["family_codes"]
+        model.family_impacts = meta["family_impacts"]
+        model.meta = meta
+        return model
+
+def labels_for(records: List[Dict[str, Any]]) -> np.ndarray:
+    labels = np.zeros((len(records), len(HEADS)), dtype=np.float32)
+    for r, record in enumerate(records):
+        labels[r, 0] = float(record["is_relevant"])
+        for subtype in record["subtypes"]:
+            family = (subtype.get("subtype_code") or "").split("-")[0].upper()
+            if family in FAMILIES:
+                labels[r, HEADS.index(family)] = 1.0
+    return labels
+
+def _agreement(predicted: np.ndarray, actual: np.ndarray) -> str:
+    tp = int(np.sum(predicted & actual))
+    precision = tp / max(int(predicted.sum()), 1)
+    recall = tp / max(int(actual.sum()), 1)
+    accuracy = float(np.mean(predicted == actual))
+    return f"accuracy {accuracy:.1%}, precision {precision:.1%}, recall {recall:.1%}"
+
+def main():
+    from src.analysis.relevance import RelevanceClassifierAgent
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=os.path.join(cache_dir(), "relevance_verdicts.jsonl"), help="verdict log or labelled JSONL sample")
+    parser.add_argument("--out", default=None, help=f"model path (default {_default_path()})")
+    parser.add_argument("--epochs", type=int, default=150)
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of records kept out of training for evaluation")
+    args = parser.parse_args()
+
+    # Latest verdict per distinct text
+    by_text: Dict[str, Dict[str, Any]] = {}
+    for record in read_verdicts(args.log):
+        by_text[" ".join(record["text"].split())] = record
+    records = list(by_text.values())
+    if len(records) < 20:
+        print(f"Only {len(records)} distinct verdicts in {args.log}; run with GOOGLE_API_KEY for a while first.")
+        return
+    labels = labels_for(records)
+    print(f"{len(records)} verdicts, {int(labels[:, 0].sum())} relevant; per family: "
+          + ", ".join(f"{f} {int(labels[:, i + 1].sum())}" for i, f in enumerate(FAMILIES)))
+
+    # Deterministic split by text hash, so re-training on a grown log keeps the same holdout
+    in_holdout = np.array([int(hashlib.md5(t.encode()).hexdigest(), 16) % 1000 < args.holdout * 1000 for t in by_text])
+    texts = [r["text"] for r in records]
+    train_idx = np.flatnonzero(~in_holdout)
+    test_idx = np.flatnonzero(in_holdout)
+
+    model = LocalRelevanceClassifier()
+    families = [[s.get("subtype_code") for s in r["subtypes"] if s.get("subtype_code")] for r in records]
+    for family in FAMILIES:
+        codes = Counter(c for cs in families for c in cs if c.split("-")[0].upper() == family)
+        impacts = Counter(s.get("impact_type") for r in records for s in r["subtypes"]
+                          if (s.get("subtype_code") or "").split("-")[0].upper() == family and s.get("impact_type"))
+        if codes:
+            model.family_codes[family] = codes.most_common(1)[0][0]
+        if impacts:
+            model.family_impacts[family] = impacts.most_common(1)[0][0]
+
+    start = time.perf_counter()
+    model.train([texts[i] for i in train_idx], labels[train_idx], epochs=args.epochs)
+    print(f"Trained on {len(train_idx)} verdicts in {time.perf_counter() - start:.1f}s")
+
+    if len(test_idx):
+        test_texts = [texts[i] for i in test_idx]
+        actual = labels[test_idx, 0] > 0
+        start = time.perf_counter()
+        predicted = model.predict_proba(test_texts)[:, 0] >= model.threshold
+        elapsed = time.perf_counter() - start
+        heuristic = RelevanceClassifierAgent()
+        keyword = np.array([
+            heuristic.classify(RawEvent(project=records[i].get("project", "unknown"), source_type=records[i].get("source_type", "Blog"),
+                                        author="", text=texts[i], url=records[i].get("url") or "", timestamp=datetime.now())).is_relevant
+            for i in test_idx
+        ])
+        print(f"Holdout of {len(test_idx)} verdicts, agreement with Gemini on relevance:")
+        print(f"  local model: {_agreement(predicted, actual)} ({len(test_idx) / max(elapsed, 1e-9):,.0f} events/sec)")
+        print(f"  keywords:    {_agreement(keyword, actual)}")
+
+    model.meta = {"trained_at": datetime.now().isoformat(), "records": len(train_idx), "source": args.log}
+    path = args.out or _default_path()
+    model.save(path)
+    print(f"Saved model to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,138 @@
-from typing import List
-from src.models import RawEvent, RelevanceSignal, AffectedSubtype
+import os
+import threading
+from typing import Any, Dict, List, Optional
+from src.models import RawEvent, RelevanceSignal, AffectedSubtype, ProjectConfig
+from src.analysis.keywords import KeywordMatcher
 
 class RelevanceClassifierAgent:
     def __init__(self):
-        # Heuristics for MVP
-        self.crypto_keywords = ["crypto", "blockchain", "ethereum", "bitcoin", "uniswap", "eigenlayer", "token", "defi", "l1", "l2", "rollup"]
-        self.economic_keywords = ["fee", "staking", "slash", "emission", "inflation", "yield", "reward", "cost", "gas", "treasury", "revenue", "tax", "burn"]
-        self.upgrade_keywords = ["upgrade", "hard fork", "migration", "v2", "v3", "v4", "activation", "deploy", "release", "update", "patch", "eip-", "proposal"]
+        # Heuristics for MVP. Whole-word matches; a trailing "*" matches any word starting with the stem.
+        self.crypto_keywords = ["crypto*", "blockchain*", "ethereum", "bitcoin", "uniswap", "eigenlayer", "token*", "defi", "l1", "l2", "rollup*"]
+        self.economic_keywords = ["fee", "staking", "slash*", "emission", "inflation*", "yield*", "reward*", "cost", "gas", "treasury", "revenue", "tax", "burn*"]
+        self.upgrade_keywords = ["upgrad*", "hard fork*", "hardfork*", "migrat*", "v2", "v3", "v4", "activat*", "deploy*", "release*", "update*", "patch*", "eip-*", "proposal"]
+        # Evergreen explainers and guides ("What is Slippage?") mention fees and tokens but never announce a change
+        self.explainer_markers = ["what is", "what are", "how to", "how does", "guide to", "a guide", "understanding", "introduction to", "intro to", "explained", "faq", "glossary", "101"]
+        # Sources of these projects are crypto by definition, keyword or not
+        self.crypto_projects = ["ethereum", "uniswap", "eigenlayer"]
+        self.matcher = KeywordMatcher({
+            "crypto": self.crypto_keywords,
+            "economic": self.economic_keywords,
+            "upgrade": self.upgrade_keywords,
+        })
+        self.project_matchers: Dict[str, KeywordMatcher] = {}
 
-    def classify(self, event: RawEvent) -> RelevanceSignal:
-        text_lower = event.text.lower()
-        
-        is_crypto = any(k in text_lower for k in self.crypto_keywords)
-        is_economic = any(k in text_lower for k in self.economic_keywords)
-        is_upgrade = any(k in text_lower for k in self.upgrade_keywords)
+    def matcher_for(self, project: str, project_config: Optional[ProjectConfig] = None) -> KeywordMatcher:
+        """
+        The default matcher extended with the project's registry `keywords`;
+        its `relevant_tokens` count as crypto keywords.
+        """
+        if project_config is None:
+            return self.project_matchers.get(project, self.matcher)
+        if project not in self.project_matchers:
+            extra = {category: list(keywords) for category, keywords in project_config.keywords.items()}
+            extra.setdefault("crypto", []).extend(project_config.relevant_tokens)
+            self.project_matchers[project] = self.matcher.extended(extra)
+        return self.project_matchers[project]
+
+    def classify(self, event: RawEvent, project_config: Optional[ProjectConfig] = None) -> RelevanceSignal:
+        hits = self.matcher_for(event.project, project_config).by_category(event.text)
+
+        is_crypto = bool(hits["crypto"])
+        is_economic = bool(hits["economic"])
+        is_upgrade = bool(hits["upgrade"])
         
         # Context-specific overrides
         # If it comes from a specific project source (e.g. Uniswap blog), is_crypto is implied true.
         # But we want to be explicit.
-        if event.project in ["ethereum", "uniswap", "eigenlayer"]:
+        if event.project in self.crypto_projects:
              is_crypto = True
 
         affected_subtypes = []
         if is_economic:
-            affected_subtypes.append(AffectedSubtype(subtype_code="G-01", impact_type="Creation", reason="Heuristic: Economic keyword matched"))
+            affected_subtypes.append(AffectedSubtype(subtype_code="G-01", impact_type="Creation", reason=f"Heuristic: Economic keyword matched ({hits['economic'][0].keyword})"))
         if is_upgrade:
-            affected_subtypes.append(AffectedSubtype(subtype_code="G-02", impact_type="Creation", reason="Heuristic: Upgrade keyword matched"))
+            affected_subtypes.append(AffectedSubtype(subtype_code="G-02", impact_type="Creation", reason=f"Heuristic: Upgrade keyword matched ({hits['upgrade'][0].keyword})"))
 
         return RelevanceSignal(
             is_relevant=(is_crypto and (is_economic or is_upgrade)),
             affected_subtypes=affected_subtypes
         )
+
+    def is_explainer(self, event: RawEvent) -> bool:
+        # The title leads the text: "Title\n\nbody" for feeds, "Title: description" for scraped pages
+        title = event.text.lower().strip().split("\n", 1)[0].split(": ", 1)[0].rstrip("?!. ")
+        return any(title.startswith(p) or title.endswith(p) for p in self.explainer_markers)
+
+    def score(self, event: RawEvent, project_config: Optional[ProjectConfig] = None) -> float:
+        """
+        Cheap 0-1 plausibility score used to gate LLM calls. Graded rather
+        than boolean so the cascade threshold can trade recall for savings.
+        Anything `classify` marks relevant scores at least 0.3, the default
+        gate threshold, unless its title reads like an explainer.
+        """
+        hits = self.matcher_for(event.project, project_config).by_category(event.text)
+        # Distinct keywords, so one word repeated throughout a post doesn't inflate the score
+        economic = len({h.keyword for h in hits["economic"]})
+        upgrade = len({h.keyword for h in hits["upgrade"]})
+        crypto = 1 if hits["crypto"] or event.project in self.crypto_projects else 0
+
+        score = 0.15 * crypto + min(economic, 3) * 0.15 + min(upgrade, 3) * 0.15
+        if self.is_explainer(event):
+            score *= 0.5
+        return min(score, 1.0)
+
+class CascadeRelevanceAgent:
+    """
+    Cheap-first relevance classification: the keyword heuristic scores every
+    event and rejects the ones below `threshold` locally; only plausible
+    candidates are sent to the (expensive) LLM agent. Lower thresholds keep
+    more recall, higher ones save more calls; `python -m
+    src.analysis.eval_relevance` measures the trade-off on a labelled sample.
+    """
+    def __init__(self, gate: RelevanceClassifierAgent, llm: Any, threshold: Optional[float] = None):
+        self.gate = gate
+        self.llm = llm
+        self.threshold = threshold if threshold is not None else float(os.getenv("RELEVANCE_GATE_THRESHOLD", "0.3"))
+        self.lock = threading.Lock()
+        self.rejected = 0
+        self.forwarded = 0
+
+    def _passes(self, event: RawEvent, project_config: Optional[ProjectConfig] = None) -> bool:
+        passed = self.gate.score(event, project_config) >= self.threshold
+        with self.lock:
+            if passed:
+                self.forwarded += 1
+            else:
+                self.rejected += 1
+        return passed
+
+    def _rejected(self) -> RelevanceSignal:
+        # Cheap to recompute, and a changed threshold or text should get a fresh look: not stored for reuse
+        return RelevanceSignal(is_relevant=False, affected_subtypes=[], provisional=True)
+
+    def classify(self, event: RawEvent, project_config: Optional[ProjectConfig] = None) -> RelevanceSignal:
+        if not self._passes(event, project_config):
+            return self._rejected()
+        return self.llm.classify(event, project_config=project_config)
+
+    def classify_many(self, events: List[RawEvent], project_config: Optional[ProjectConfig] = None) -> List[RelevanceSignal]:
+        candidates = [i for i, e in enumerate(events) if self._passes(e, project_config)]
+        results = [self._rejected() for _ in events]
+        if not candidates:
+            return results
+        if hasattr(self.llm, "classify_many"):
+            signals = self.llm.classify_many([events[i] for i in candidates], project_config=project_config)
+        else:
+            signals = [self.llm.classify(events[i], project_config=project_config) for i in candidates]
+        for i, signal in zip(candidates, signals):
+            results[i] = signal
+        return results
+
+    def report(self) -> str:
+        total = self.rejected + self.forwarded
+        return f"[Relevance Gate] {self.rejected}/{total} events rejected before the LLM (threshold {self.threshold})"
+
+    def reset_stats(self):
+        with self.lock:
+            self.rejected = 0
+            self.forwarded = 0
@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+from typing import List, Optional, Tuple
+from src.models import RawEvent, SourceType
+from src.ingestion.html_extract import feed_entry_html, html_paragraphs
+from src.analysis.keywords import KeywordMatcher
+
+# Long passages are cut at sentence ends into pieces of about this many characters
+MAX_PASSAGE_CHARS = 800
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+# Block numbers, epochs, EIP/BIP ids, versions and percentages are the concrete details evidence quotes need
+SPECIFICS = re.compile(r'\b(?:block|epoch|slot|height)\s+#?\d[\d,]*|\b[a-z]{2,4}-\d{2,5}\b|\bv\d+(?:\.\d+)+\b|\d+(?:\.\d+)?\s?%', re.IGNORECASE)
+ELISION = "\n[...]\n"
+
+class SnippetSelector:
+    """
+    Chooses what part of an event the LLM sees. Scraped blog events carry the
+    main-content article in `raw_data["article_text"]`, feed entries their
+    HTML, from which it is extracted on demand; the article is split into
+    passages, each scored for upgrade, governance and tokenomics signal, and
+    the best ones are kept (in document order) up to `token_budget`. The
+    opening passage is always kept for context. Texts that already fit the
+    budget are passed through unchanged.
+    """
+    WEIGHTS = {"upgrade": 1.0, "governance": 1.0, "tokenomics": 1.5}
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget or int(os.getenv("SNIPPET_TOKEN_BUDGET", "800"))
+        self.matcher = KeywordMatcher({
+            "upgrade": ["upgrad*", "hard fork*", "hardfork*", "mainnet", "testnet", "activat*", "deploy*", "launch*", "live", "migrat*", "v2", "v3", "v4", "eip-*", "bip-*", "contract*", "protocol"],
+            "governance": ["governance", "vote*", "voting", "dao", "proposal*", "quorum", "delegat*", "council", "multisig", "timelock", "snapshot", "veto"],
+            "tokenomics": ["fee", "staking", "stake*", "slash*", "emission*", "inflation*", "issuance", "yield*", "reward*", "treasury", "revenue", "burn*", "buyback*", "supply", "mint*", "unlock*", "vesting", "airdrop*", "collateral", "holders"],
+        })
+        self.lock = threading.Lock()
+        self.chars_in = 0
+        self.chars_out = 0
+
+    def passages(self, text: str) -> List[str]:
+        passages: List[str] = []
+        for block in re.split(r'\n\s*\n', text):
+            block = " ".join(block.split())
+            if not block:
+                continue
+            if len(block) <= MAX_PASSAGE_CHARS:
+                passages.append(block)
+                continue
+            current = ""
+            for sentence in SENTENCE_END.split(block):
+                if current and len(current) + len(sentence) > MAX_PASSAGE_CHARS:
+                    passages.append(current)
+                    current = ""
+                current = f"{current} {sentence}".strip()
+            if current:
+                passages.append(current)
+        return passages
+
+    def score(self, passage: str) -> float:
+        hits = self.matcher.find(passage)
+        # Distinct keywords per category, so a repeated word doesn't dominate
+        score = sum(self.WEIGHTS[c] for c, _ in {(h.category, h.keyword) for h in hits})
+        score += 0.5 * len(SPECIFICS.findall(passage))
+        # Normalized by length so one huge passage doesn't beat several focused ones
+        return score / max(1.0, len(passage) / 400)
+
+    def select_text(self, header: str, article: str) -> str:
+        budget_chars = self.token_budget * 4 - len(header)
+        if len(article) + 2 <= budget_chars:
+            return f"{header}\n\n{article}" if header else article
+        passages = self.passages(article)
+
+        chosen: List[int] = []
+        used = 0
+        # The opening passage (lede) first, then the highest-signal ones
+        ranked: List[Tuple[float, int]] = sorted(((self.score(p), i) for i, p in enumerate(passages) if i > 0), reverse=True)
+        for score, i in ([(1.0, 0)] if passages else []) + ranked:
+            # Passages without any signal are left out even when there's room
+            if score <= 0:
+                break
+            cost = len(passages[i]) + len(ELISION)
+            if used + cost > budget_chars:
+                continue
+            chosen.append(i)
+            used += cost
+        if not chosen and passages:
+            # Not even the lede fits: truncate it
+            return f"{header}\n\n{passages[0][:max(0, budget_chars)]}"
+
+        parts: List[str] = []
+        previous = -1
+        for i in sorted(chosen):
+            if parts and i != previous + 1:
+                parts.append(ELISION.strip())
+            parts.append(passages[i])
+            previous = i
+        body = "\n\n".join(parts)
+        return f"{header}\n\n{body}" if header else body
+
+    def select(self, event: RawEvent) -> str:
+        """
+        The text to send to the LLM for `event`.
+        """
+        raw = event.raw_data if isinstance(event.raw_data, dict) else {}
+        article = raw.get("article_text") or ""
+        if not article and event.source_type == SourceType.BLOG:
+            # Feed entries keep their HTML; extracted here so events that never reach the LLM skip the parse
+            html = feed_entry_html(raw)
+            article = "\n\n".join(html_paragraphs(html)) if html else ""
+        if article:
+            # Keep the "title: description" line the event text starts with
+            header = event.text.split("\n\n", 1)[0]
+        else:
+            header, _, article = event.text.partition("\n\n")
+            if not article:
+                header, article = "", event.text
+        selected = self.select_text(header, article)
+        with self.lock:
+            self.chars_in += len(header) + len(article)
+            self.chars_out += len(selected)
+        return selected
+
+    def report(self) -> str:
+        saved = (1 - self.chars_out / self.chars_in) * 100 if self.chars_in else 0.0
+        return f"[Snippets] LLM input reduced to {self.chars_out // 4} of {self.chars_in // 4} estimated tokens ({saved:.0f}% saved)"
+
+    def reset_stats(self):
+        with self.lock:
+            self.chars_in = 0
+            self.chars_out = 0
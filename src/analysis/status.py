@@ -1,27 +1,53 @@
 import re
-from src.models import RawEvent, UpgradeStatus
+from typing import Dict, Optional
+from src.models import RawEvent, UpgradeStatus, ProjectConfig
+from src.analysis.keywords import Hit, KeywordMatcher, preceding_clause
+
+# A status keyword preceded by one of these in the same sentence describes a future
+# or unmet state: "will be live", "is expected to be activated", "has not been deployed"
+NOT_YET = re.compile(r"(?:\b(?:will|would|shall|to be|going to|expected|plan(?:s|ned|ning)?|scheduled (?:to|for)|once|until|if|not|yet to|soon|upcoming)\b|n't\b)")
+# Deployment wording inside a proposal ("Proposal to activate the fee switch on mainnet") is the
+# proposed action, not a fact; approval wording ("the proposal passed") still counts
+PROPOSING = re.compile(r"\b(?:propos(?:al|als|e|es|ed|ing)|temp(?:erature)? check|a?rfc)\b")
+# Forum and Snapshot titles: "Proposal: ...", "[Temp Check] ...", "[ARFC] ...", "Draft: ..."
+PROPOSAL_TITLE = re.compile(r"^\W*(?:pre-?proposal|proposal|temp(?:erature)? check|a?rfc|draft)\b", re.IGNORECASE)
 
 class UpgradeStatusAgent:
     def __init__(self):
-        self.deployed_keywords = ["live", "activated", "executed", "deployed", "mainnet", "on-chain", "successful"]
+        self.deployed_keywords = ["live", "activated", "executed", "deployed", "mainnet", "on-chain", "successful*"]
         self.approved_keywords = ["approved", "passed", "governance pass", "scheduled"]
-        
-    def determine_status(self, event: RawEvent) -> UpgradeStatus:
-        text_lower = event.text.lower()
-
-        # Check for deployed/live signals first (highest priority)
-        if any(k in text_lower for k in self.deployed_keywords):
-            # Must check if it says "now live" or "is live" vs "will be live"
-            # MVP: simple keyword match. "will be live" might trigger false positive.
-            # Improvement: Check for future tense.
-            if "will be" in text_lower or "planning" in text_lower or "proposal" in text_lower:
-                 # Ambiguous. If it has explicit "live" it might be "X is live, Y will be live".
-                 pass
-            else:
-                 return UpgradeStatus.DEPLOYED_MAINNET
-        
+        self.matcher = KeywordMatcher({
+            "deployed": self.deployed_keywords,
+            "approved": self.approved_keywords,
+        })
+        self.project_matchers: Dict[str, KeywordMatcher] = {}
+
+    def matcher_for(self, project: str, project_config: Optional[ProjectConfig] = None) -> KeywordMatcher:
+        if project_config is None:
+            return self.project_matchers.get(project, self.matcher)
+        if project not in self.project_matchers:
+            extra = {c: k for c, k in project_config.keywords.items() if c in ("deployed", "approved")}
+            self.project_matchers[project] = self.matcher.extended(extra)
+        return self.project_matchers[project]
+
+    def _is_current(self, text: str, hit: Hit) -> bool:
+        return not NOT_YET.search(preceding_clause(text, hit))
+
+    def _is_deployed(self, text: str, hit: Hit) -> bool:
+        clause = preceding_clause(text, hit)
+        return not NOT_YET.search(clause) and not PROPOSING.search(clause)
+
+    def determine_status(self, event: RawEvent, project_config: Optional[ProjectConfig] = None) -> UpgradeStatus:
+        hits = self.matcher_for(event.project, project_config).by_category(event.text)
+
+        # Deployed/live signals first (highest priority), but only when stated as a fact:
+        # "X is live, Y will be live" counts, "will be live on mainnet" alone doesn't.
+        # Nothing in a proposal post counts as deployed.
+        if not PROPOSAL_TITLE.match(event.text) and any(self._is_deployed(event.text, h) for h in hits["deployed"]):
+            return UpgradeStatus.DEPLOYED_MAINNET
+
         # Check for approved signals
-        if any(k in text_lower for k in self.approved_keywords):
+        if any(self._is_current(event.text, h) for h in hits["approved"]):
              return UpgradeStatus.APPROVED_NOT_DEPLOYED
-             
+
         return UpgradeStatus.PROPOSAL_ONLY
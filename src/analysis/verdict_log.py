@@ -0,0 +1,58 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, Iterator, Optional
+from src.models import RawEvent
+from src.ingestion.http_cache import cache_dir
+
+class VerdictLog:
+    """
+    Append-only JSONL log of fresh LLM relevance verdicts (cache hits are
+    not logged again), with the exact text the model saw. It is the training
+    set for the local fallback classifier (src.analysis.local_classifier).
+    Disabled with LLM_VERDICT_LOG=0.
+    """
+    def __init__(self, path: Optional[str] = None):
+        setting = os.getenv("LLM_VERDICT_LOG", "")
+        self.enabled = setting != "0"
+        self.path = path or (setting if setting not in ("", "0", "1") else os.path.join(cache_dir(), "relevance_verdicts.jsonl"))
+        self.lock = threading.Lock()
+
+    def add(self, event: RawEvent, text: str, data: Dict[str, Any]):
+        if not self.enabled or not data:
+            return
+        record = {
+            "timestamp": time.time(),
+            "project": event.project,
+            "source_type": event.source_type.value,
+            "url": event.url,
+            "text": text,
+            "is_relevant": bool(data.get("is_relevant", bool(data.get("affected_subtypes")))),
+            "subtypes": [
+                {"subtype_code": s.get("subtype_code"), "impact_type": s.get("impact_type")}
+                for s in data.get("affected_subtypes") or [] if isinstance(s, dict)
+            ],
+        }
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            try:
+                with open(self.path, "a") as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"Could not append to verdict log {self.path}: {e}")
+
+def read_verdicts(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields verdict records; also accepts the labelled samples used by
+    src.analysis.eval_relevance (`{"text": ..., "relevant": bool}`).
+    """
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "is_relevant" not in record and "relevant" in record:
+                record["is_relevant"] = bool(record["relevant"])
+            record.setdefault("subtypes", [])
+            yield record
@@ -1,4 +1,5 @@
 import os
+import json
 from typing import Dict, List, Any
 from datetime import datetime
 from uuid import UUID
@@ -43,6 +44,28 @@ class StateManager:
         except Exception as e:
             print(f"Error saving state to Supabase: {e}")
 
+    # Extra watcher state (feed discovery etc.) lives in the same table as the cursors,
+    # JSON-encoded under a "<watcher_id>_state" key.
+    def get_watcher_state(self, watcher_id: str) -> Dict[str, Any]:
+        raw = self.cursors.get(f"{watcher_id}_state")
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {}
+
+    def update_watcher_state(self, watcher_id: str, state: Dict[str, Any]):
+        key = f"{watcher_id}_state"
+        raw = json.dumps(state, sort_keys=True)
+        if self.cursors.get(key) == raw:
+            return
+        self.cursors[key] = raw
+        try:
+            supabase.table('state').upsert({'id': key, 'cursor': raw}).execute()
+        except Exception as e:
+            print(f"Error saving watcher state to Supabase: {e}")
+
 
 class OutputManager:
     def __init__(self):
@@ -59,8 +82,11 @@ class OutputManager:
         except Exception as e:
             print(f"Error loading existing upgrades from Supabase: {e}")
 
-    def save_upgrade(self, upgrade: CanonicalUpgrade):
-        current_id = f"{upgrade.project}_{upgrade.headline}"
+    def upgrade_id(self, upgrade: CanonicalUpgrade) -> str:
+        return f"{upgrade.project}_{upgrade.headline}"
+
+    def save_upgrade(self, upgrade: CanonicalUpgrade) -> str:
+        current_id = self.upgrade_id(upgrade)
         
         upgrade_dict = upgrade.model_dump()
         upgrade_dict['id'] = current_id
@@ -81,6 +107,26 @@ class OutputManager:
             }
             self.upgrades.append(supabase_row)
             self.existing_ids.add(current_id)
+        return current_id
+
+    def add_supporting_source(self, upgrade_id: str, url: str):
+        """
+        Appends a URL to the supporting sources of an already stored upgrade.
+        """
+        try:
+            response = supabase.table('upgrades').select('payload').eq('id', upgrade_id).execute()
+            data = response.data if response and hasattr(response, 'data') else []
+            if not data:
+                return
+            payload = data[0]['payload']
+            sources = payload.setdefault('supporting_sources', [])
+            if url == payload.get('primary_source') or url in sources:
+                return
+            sources.append(url)
+            supabase.table('upgrades').update({'payload': payload}).eq('id', upgrade_id).execute()
+            print(f"Attached {url} to {upgrade_id} as supporting evidence.")
+        except Exception as e:
+            print(f"Error attaching supporting source to {upgrade_id}: {e}")
 
     def flush(self):
         if not self.upgrades:
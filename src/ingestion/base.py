@@ -1,13 +1,29 @@
+import asyncio
+import urllib.parse
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Set, Dict, Any
 from datetime import datetime
 from src.models import RawEvent, ProjectConfig
+from src.ingestion.http_cache import ValidatorCache
+from src.ingestion.http_client import HttpClient
 
 class BaseWatcher(ABC):
-    def __init__(self, project_name: str, config: ProjectConfig):
+    def __init__(self, project_name: str, config: ProjectConfig, http_cache: Optional[ValidatorCache] = None, http: Optional[HttpClient] = None):
         self.project_name = project_name
         self.config = config
         self.last_seen_cursor: Optional[datetime] = None
+        # Shared pooled HTTP client and conditional-request cache; private ones are created if none are injected
+        self.http = http or (http_cache.http if http_cache else HttpClient())
+        self.http_cache = http_cache or ValidatorCache(http=self.http)
+        self.rate_limiter = self.http.rate_limiter
+        # Fraction of recent polls that found new events (EMA). Busy sources get first call on API quota.
+        self.activity: float = 0.5
+        # Cadence stats owned by the PollScheduler (mean posting gap, failures, ...)
+        self.schedule: Dict[str, Any] = {}
+
+    @property
+    def watcher_id(self) -> str:
+        return f"{self.project_name}_{self.__class__.__name__}"
 
     @abstractmethod
     def poll(self) -> List[RawEvent]:
@@ -17,9 +33,57 @@ class BaseWatcher(ABC):
         """
         pass
 
+    async def poll_async(self) -> List[RawEvent]:
+        """
+        Async variant of poll(). The default implementation runs the blocking
+        poll() in a worker thread so watchers can be polled concurrently.
+        """
+        return await asyncio.to_thread(self.poll)
+
+    def hosts(self) -> Set[str]:
+        """
+        Hostnames this watcher talks to. Used by the ingestion engine to
+        enforce per-host concurrency caps.
+        """
+        return set()
+
+    @property
+    def conditional(self) -> bool:
+        """
+        Only send conditional requests once a cursor exists. Without one (first
+        run or reset state) we need the full payload even if it is unchanged.
+        """
+        return self.last_seen_cursor is not None
+
+    @property
+    def priority(self) -> float:
+        return self.activity
+
+    def record_activity(self, event_count: int, alpha: float = 0.3):
+        self.activity = (1 - alpha) * self.activity + alpha * (1.0 if event_count > 0 else 0.0)
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Extra per-watcher state (beyond the cursor) to persist in the state store.
+        """
+        return {"activity": round(self.activity, 4), "schedule": self.schedule}
+
+    def load_state(self, state: Dict[str, Any]):
+        """
+        Restores state previously returned by get_state().
+        """
+        self.activity = float(state.get("activity", self.activity))
+        self.schedule = dict(state.get("schedule", {}))
+
     def update_cursor(self, latest_timestamp: datetime):
         """
         Updates the cursor to the latest timestamp seen.
         """
         if self.last_seen_cursor is None or latest_timestamp > self.last_seen_cursor:
             self.last_seen_cursor = latest_timestamp
+
+def host_of(url: str) -> str:
+    # Registry entries are often bare hostnames ("blog.ethereum.org")
+    if "://" not in url:
+        url = f"https://{url}"
+    return urllib.parse.urlparse(url).hostname or url
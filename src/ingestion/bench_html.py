@@ -0,0 +1,79 @@
+"""
+Micro-benchmark for blog page extraction: BeautifulSoup's html.parser
+(reference) vs the lxml fast path in html_extract.
+
+Downloads every page listed in a URL file once, then times both extractors
+over the same bytes and checks that they produce identical fields (and so
+identical RawEvent text and timestamps).
+
+    python -m src.ingestion.bench_html [test_urls.txt] [--repeat 5]
+"""
+import re
+import sys
+import time
+import argparse
+from typing import List
+from src.ingestion.http_client import HttpClient
+from src.ingestion.html_extract import HAS_LXML, extract_page_soup, extract_page_lxml
+
+URL_LINE = re.compile(r'^(?:URL:\s*)?(https?://\S+)\s*$')
+
+def load_urls(path: str) -> List[str]:
+    urls = []
+    with open(path, "r") as f:
+        for line in f:
+            match = URL_LINE.match(line.strip())
+            if match and match.group(1) not in urls:
+                urls.append(match.group(1))
+    return urls
+
+def time_extractor(fn, content: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(content)
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("url_file", nargs="?", default="test_urls.txt")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if not HAS_LXML:
+        print("lxml is not installed; nothing to compare against.")
+        sys.exit(1)
+
+    http = HttpClient()
+    pages = []
+    for url in load_urls(args.url_file):
+        try:
+            resp = http.get(url)
+            if resp.status_code == 200:
+                pages.append((url, resp.content))
+            else:
+                print(f"Skipping {url}: HTTP {resp.status_code}")
+        except Exception as e:
+            print(f"Skipping {url}: {e}")
+
+    if not pages:
+        print("No pages downloaded.")
+        sys.exit(1)
+
+    total_soup = total_lxml = 0.0
+    mismatches = 0
+    print(f"{'page':60} {'soup ms':>9} {'lxml ms':>9} {'speedup':>8}  identical")
+    for url, content in pages:
+        identical = extract_page_soup(content) == extract_page_lxml(content)
+        mismatches += 0 if identical else 1
+        soup_s = time_extractor(extract_page_soup, content, args.repeat)
+        lxml_s = time_extractor(extract_page_lxml, content, args.repeat)
+        total_soup += soup_s
+        total_lxml += lxml_s
+        print(f"{url[-60:]:60} {soup_s * 1000:9.1f} {lxml_s * 1000:9.1f} {soup_s / lxml_s:7.1f}x  {identical}")
+
+    print(f"\n{len(pages)} pages: html.parser {total_soup * 1000:.0f} ms, lxml {total_lxml * 1000:.0f} ms "
+          f"({total_soup / total_lxml:.1f}x faster), {mismatches} mismatching pages")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,90 @@
+import os
+import io
+import hashlib
+import gzip
+import xml.etree.ElementTree as ET
 import feedparser
-import requests
 import json
 import urllib.parse
 from bs4 import BeautifulSoup
-from typing import List, Optional, Set
-from datetime import datetime, timezone
+from typing import List, Optional, Set, Dict, Any, Tuple, Iterator
+from datetime import datetime, timezone, timedelta
 from src.models import RawEvent, ProjectConfig, SourceType
-from src.ingestion.base import BaseWatcher
+from src.ingestion.base import BaseWatcher, host_of
+from src.ingestion.http_cache import ValidatorCache
+from src.ingestion.http_client import HttpClient
+from src.ingestion.page_cache import PageCache
+from src.ingestion.html_extract import extract_page, feed_entry_html
+from src.ingestion.dates import extract_published_date
 
 class BlogRSSAgent(BaseWatcher):
+    # Re-run full feed discovery at least this often, even if the remembered strategy still works
+    DISCOVERY_TTL = timedelta(hours=float(os.getenv("FEED_DISCOVERY_TTL_HOURS", "168")))
+    # Events returned on the first poll (no cursor yet)
+    INITIAL_POLL_LIMIT = 20
+    MAX_SITEMAP_DEPTH = 2
+
+    def __init__(self, project_name: str, config: ProjectConfig, http_cache: Optional[ValidatorCache] = None, http: Optional[HttpClient] = None, page_cache: Optional[PageCache] = None):
+        super().__init__(project_name, config, http_cache, http)
+        self.page_cache = page_cache or PageCache()
+        # blog_url -> {"strategy": "rss" | "sitemap" | "html", "url": ..., "discovered_at": iso, "hub"?, "topic"?}
+        self.feed_discovery: Dict[str, Dict[str, str]] = {}
+        # feed_url -> {"hub": ..., "topic": ...} for feeds that advertise a WebSub hub
+        self.feed_hubs: Dict[str, Dict[str, str]] = {}
+
+    def hosts(self) -> Set[str]:
+        return {host_of(b) for b in self.config.blogs}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {**super().get_state(), "feed_discovery": self.feed_discovery}
+
+    def load_state(self, state: Dict[str, Any]):
+        super().load_state(state)
+        self.feed_discovery = dict(state.get("feed_discovery", {}))
+
     def poll(self) -> List[RawEvent]:
         all_events = []
         seen_urls = set()
 
+        def collect(events: List[RawEvent]):
+            for e in events:
+                if e.url not in seen_urls:
+                    all_events.append(e)
+                    seen_urls.add(e.url)
+
         for blog_url in self.config.blogs:
             print(f"Polling blog: {blog_url}")
-            
+
+            # 0. Try the strategy that worked last time before walking the whole discovery chain
+            record = self._fresh_discovery(blog_url)
+            if record:
+                events = self._poll_known_strategy(blog_url, record)
+                if events is not None:
+                    print(f"  [Discovery] {record['strategy']} via {record['url']}: {len(events)} new events")
+                    collect(events)
+                    continue
+                print(f"  [Discovery] Remembered {record['strategy']} strategy failed. Rediscovering...")
+                self.feed_discovery.pop(blog_url, None)
+
             # 1. Try RSS/Atom Feeds
-            feed_events = self._poll_rss(blog_url)
+            feed_events, feed_url = self._poll_rss(blog_url)
             if feed_events is not None:
+                self._remember(blog_url, "rss", feed_url)
                 if len(feed_events) > 0:
                     print(f"  Found {len(feed_events)} new events via RSS")
-                    for e in feed_events:
-                        if e.url not in seen_urls:
-                            all_events.append(e)
-                            seen_urls.add(e.url)
+                    collect(feed_events)
                 else:
                     print(f"  Valid RSS feed found. No new events since last cursor.")
                 continue # If we found a valid RSS feed, we don't attempt fallbacks
-            
+
             # 2. Try Sitemap
             print(f"  RSS failed or missing. Trying Sitemap...")
             sitemap_events = self._poll_sitemap(blog_url)
             if sitemap_events is not None:
+                self._remember(blog_url, "sitemap", self._sitemap_url(blog_url))
                 if len(sitemap_events) > 0:
                     print(f"  Found {len(sitemap_events)} events via Sitemap")
-                    for e in sitemap_events:
-                        if e.url not in seen_urls:
-                            all_events.append(e)
-                            seen_urls.add(e.url)
+                    collect(sitemap_events)
                 else:
                     print(f"  Valid Sitemap found. No new events since last cursor.")
                 continue
@@ -46,36 +92,83 @@ class BlogRSSAgent(BaseWatcher):
             # 3. Try HTML Fallback (Listing Page)
             print(f"  Sitemap failed. Trying HTML scraping...")
             html_events = self._poll_html(blog_url)
+            if html_events is not None:
+                self._remember(blog_url, "html", self._base_url(blog_url))
             if html_events:
                 print(f"  Found {len(html_events)} events via HTML scraping")
-                for e in html_events:
-                    if e.url not in seen_urls:
-                        all_events.append(e)
-                        seen_urls.add(e.url)
+                collect(html_events)
 
         all_events.sort(key=lambda x: x.timestamp)
-        
+
         # Safety catch-all filter to ensure no old events slipped through the parsers
         if self.last_seen_cursor:
             filtered_events = [e for e in all_events if e.timestamp > self.last_seen_cursor]
             if len(filtered_events) < len(all_events):
                 print(f"  [Filter] Dropped {len(all_events) - len(filtered_events)} old events globally.")
             all_events = filtered_events
-            
+
         # Limit initial fetch to avoid overwhelming the pipeline
         if not self.last_seen_cursor:
             # Sort and take latest N to avoid processing entire history on first run
-            if len(all_events) > 20:
-                print(f"  [Limit] Returning latest 20 events for initial poll")
-                all_events = all_events[-20:]
-            
+            if len(all_events) > self.INITIAL_POLL_LIMIT:
+                print(f"  [Limit] Returning latest {self.INITIAL_POLL_LIMIT} events for initial poll")
+                all_events = all_events[-self.INITIAL_POLL_LIMIT:]
+
         return all_events
 
-    def _poll_rss(self, blog_url: str) -> Optional[List[RawEvent]]:
-        # ... (Existing RSS logic with minor refactor) ...
+    def _base_url(self, blog_url: str) -> str:
+        return blog_url if blog_url.startswith("http") else f"https://{blog_url}"
+
+    def _sitemap_url(self, blog_url: str) -> str:
+        return f"{self._base_url(blog_url).rstrip('/')}/sitemap.xml"
+
+    def _fresh_discovery(self, blog_url: str) -> Optional[Dict[str, str]]:
+        record = self.feed_discovery.get(blog_url)
+        if not record:
+            return None
+        try:
+            discovered_at = datetime.fromisoformat(record["discovered_at"])
+        except (KeyError, ValueError):
+            return None
+        if datetime.now(timezone.utc) - discovered_at > self.DISCOVERY_TTL:
+            print(f"  [Discovery] Remembered strategy expired. Rediscovering...")
+            return None
+        return record
+
+    def _remember(self, blog_url: str, strategy: str, url: str):
+        self.feed_discovery[blog_url] = {
+            "strategy": strategy,
+            "url": url,
+            "discovered_at": datetime.now(timezone.utc).isoformat(),
+            # Lets the push receiver subscribe to the feed
+            **self.feed_hubs.get(url, {})
+        }
+
+    def _note_hub(self, feed_url: str, feed):
+        links = feed.feed.get("links", []) if hasattr(feed, "feed") else []
+        hub = next((l.get("href") for l in links if l.get("rel") == "hub" and l.get("href")), None)
+        if hub:
+            topic = next((l.get("href") for l in links if l.get("rel") == "self" and l.get("href")), feed_url)
+            self.feed_hubs[feed_url] = {"hub": hub, "topic": topic}
+
+    def _poll_known_strategy(self, blog_url: str, record: Dict[str, str]) -> Optional[List[RawEvent]]:
+        strategy = record.get("strategy")
+        if strategy == "rss":
+            events, _ = self._poll_rss(blog_url, feed_urls=[record["url"]])
+            return events
+        if strategy == "sitemap":
+            return self._poll_sitemap(blog_url)
+        if strategy == "html":
+            return self._poll_html(blog_url)
+        return None
+
+    def _poll_rss(self, blog_url: str, feed_urls: Optional[List[str]] = None) -> Tuple[Optional[List[RawEvent]], Optional[str]]:
+        """
+        Returns (events, feed_url) for the first working feed, or (None, None).
+        """
         # Common feed paths
-        base = blog_url if blog_url.startswith("http") else f"https://{blog_url}"
-        feed_urls = [
+        base = self._base_url(blog_url)
+        feed_urls = feed_urls or [
             f"{base.rstrip('/')}/feed",
             f"{base.rstrip('/')}/rss",
             f"{base.rstrip('/')}/rss.xml",
@@ -88,18 +181,23 @@ class BlogRSSAgent(BaseWatcher):
             try:
                 # Use requests first to handle SSL/User-Agent better than feedparser's internal fetcher
                 # The debug script showed feedparser failing SSL while requests succeeded.
-                headers = {"User-Agent": "CryptoUpgradeMonitor/1.0"}
-                resp = requests.get(url, headers=headers, timeout=10)
+                resp, not_modified = self.http_cache.fetch(url, conditional=self.conditional)
+                if not_modified:
+                    # Validators are only stored for working feeds, so this is a valid feed with nothing new
+                    print(f"  [Cache] {url} not modified")
+                    return [], url
                 
                 if resp.status_code == 200:
                     # Parse the content directly
                     f = feedparser.parse(resp.content)
                     
                     if len(f.entries) > 0:
+                        self.http_cache.record(url, resp)
+                        self._note_hub(url, f)
                         events = []
                         for entry in f.entries:
                             events.append(self._parse_feed_entry(entry))
-                        return [e for e in events if e is not None]
+                        return [e for e in events if e is not None], url
                 else:
                     # Fallback to standard feedparser if requests fails (unlikely given debug results)
                     f = feedparser.parse(url)
@@ -107,12 +205,12 @@ class BlogRSSAgent(BaseWatcher):
                         events = []
                         for entry in f.entries:
                             events.append(self._parse_feed_entry(entry))
-                        return [e for e in events if e is not None]
+                        return [e for e in events if e is not None], url
 
             except Exception as e:
                 # print(f"Error fetching RSS {url}: {e}")
                 continue
-        return None
+        return None, None
 
     def _parse_feed_entry(self, entry) -> Optional[RawEvent]:
         # Helper to parse feedparser entry
@@ -130,92 +228,138 @@ class BlogRSSAgent(BaseWatcher):
 
         from bs4 import BeautifulSoup
         
-        content = ""
-        if 'content' in entry and len(entry.content) > 0:
-            content = entry.content[0].value
-        else:
-            content = entry.get('summary', '')
+        content = feed_entry_html(entry)
             
         content_text = BeautifulSoup(content, 'html.parser').get_text() if content else ""
         content_clean = " ".join(content_text.split())[:4000]
 
-        return RawEvent(
+        return RawEvent.trusted(
             project=self.project_name,
             source_type=SourceType.BLOG,
             author=entry.get('author', 'unknown'),
             text=f"{entry.get('title', '')}\n\n{content_clean}",
             url=entry.get('link', ''),
             timestamp=published_time,
+            # The main content is only extracted for events that reach the LLM (SnippetSelector)
             raw_data=dict(entry)
         )
 
     def _poll_sitemap(self, blog_url: str) -> Optional[List[RawEvent]]:
-        base = blog_url if blog_url.startswith("http") else f"https://{blog_url}"
-        sitemap_url = f"{base.rstrip('/')}/sitemap.xml"
+        sitemap_url = self._sitemap_url(blog_url)
         
         try:
-            resp = requests.get(sitemap_url, timeout=10, headers={"User-Agent": "CryptoUpgradeMonitor/1.0"})
+            resp, not_modified = self.http_cache.fetch(sitemap_url, conditional=self.conditional)
+            if not_modified:
+                print(f"  [Cache] {sitemap_url} not modified")
+                return []
             if resp.status_code != 200:
                 return None
             
-            soup = BeautifulSoup(resp.content, 'xml')
-            urls = soup.find_all('url')
-            
-            # We will process all sitemap URLs and rely on the sorting and limit in `poll()`
-            # to return the correct top 20 latest events.
+            # Collect (loc, lastmod) pairs newer than the cursor, following sitemap indexes
+            entries: List[Tuple[str, datetime]] = []
+            self._collect_sitemap_entries(sitemap_url, resp.content, entries, depth=0)
+            self.http_cache.record(sitemap_url, resp)
+
+            # Sitemaps don't carry titles/text, so every new item needs a page fetch.
+            # Fetch newest-first and stop as soon as the output budget is filled instead
+            # of downloading every page and truncating afterwards.
+            entries.sort(key=lambda x: x[1], reverse=True)
+            budget = None if self.last_seen_cursor else self.INITIAL_POLL_LIMIT
             events = []
-            for url_tag in urls:
-                loc = url_tag.find('loc').text if url_tag.find('loc') else None
-                lastmod = url_tag.find('lastmod').text if url_tag.find('lastmod') else None
-                
-                if not loc or not lastmod:
-                    continue
-                
-                # Filter for blog post patterns if possible?
-                # Or just ingest everything and let Relevance agent filter.
-                
-                try:
-                    # ISO 8601 parsing
-                    # lastmod might be YYYY-MM-DD or full datetime
-                    if 'T' in lastmod:
-                        dt = datetime.fromisoformat(lastmod.replace('Z', '+00:00'))
-                    else:
-                        dt = datetime.fromisoformat(lastmod)
-                    
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                except ValueError:
-                    continue
-                    
-                if self.last_seen_cursor and dt <= self.last_seen_cursor:
-                    continue
-                
-                # Note: Sitemap doesn't have title/text usually. 
-                # We might need to fetch the page to get title, or just return URL.
-                # User wants "Text" for relevance checking.
-                # MVP: Fetch page title? Or just return URL as text?
-                # Let's try to fetch page title efficiently? No, too slow for sitemap.
-                # Let's use URL as headline and hope RelevanceAgent can fetch or infer?
-                # Actually, `RawEvent` expects `text`. 
-                # Improving robustness: Let's fetch the page content for the *new* items only.
-                
-                events.append(self._fetch_page_metadata(loc, dt))
-                
-            return [e for e in events if e is not None]
+            fetched = 0
+            for loc, dt in entries:
+                if budget is not None and len(events) >= budget:
+                    break
+                fetched += 1
+                event = self._fetch_page_metadata(loc, dt)
+                if event is not None:
+                    events.append(event)
+
+            if fetched < len(entries):
+                print(f"  [Sitemap] Fetched {fetched} of {len(entries)} candidate pages")
+            return events
         except Exception as e:
             print(f"Sitemap error: {e}")
             return None
 
-    def _poll_html(self, blog_url: str) -> List[RawEvent]:
-        base = blog_url if blog_url.startswith("http") else f"https://{blog_url}"
+    def _collect_sitemap_entries(self, sitemap_url: str, content: bytes, entries: List[Tuple[str, datetime]], depth: int):
+        for kind, loc, lastmod in self._iter_sitemap(sitemap_url, content):
+            dt = self._parse_lastmod(lastmod) if lastmod else None
+
+            if kind == "sitemap":
+                # Sitemap index: skip child sitemaps that haven't changed since the cursor
+                if depth >= self.MAX_SITEMAP_DEPTH:
+                    continue
+                if self.last_seen_cursor and dt and dt <= self.last_seen_cursor:
+                    continue
+                try:
+                    child, not_modified = self.http_cache.fetch(loc, conditional=self.conditional)
+                    if not_modified or child.status_code != 200:
+                        continue
+                    self._collect_sitemap_entries(loc, child.content, entries, depth + 1)
+                    self.http_cache.record(loc, child)
+                except Exception as e:
+                    print(f"Sitemap error for {loc}: {e}")
+                continue
+
+            if not dt:
+                continue
+            if self.last_seen_cursor and dt <= self.last_seen_cursor:
+                continue
+            entries.append((loc, dt))
+
+    def _iter_sitemap(self, sitemap_url: str, content: bytes) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """
+        Streams ("url" | "sitemap", loc, lastmod) tuples out of a sitemap or sitemap
+        index without building the whole document. Handles gzipped sitemaps.
+        """
+        stream = io.BytesIO(content)
+        if sitemap_url.endswith(".gz") or content[:2] == b"\x1f\x8b":
+            stream = gzip.GzipFile(fileobj=stream)
+
+        loc = lastmod = None
+        for _, elem in ET.iterparse(stream, events=("end",)):
+            tag = elem.tag.rsplit('}', 1)[-1] # strip the sitemap namespace
+            # First <loc> wins; image/video extensions nest their own <image:loc> after it
+            if tag == "loc" and loc is None:
+                loc = (elem.text or "").strip()
+            elif tag == "lastmod" and lastmod is None:
+                lastmod = (elem.text or "").strip()
+            elif tag in ("url", "sitemap"):
+                if loc:
+                    yield tag, loc, lastmod
+                loc = lastmod = None
+                elem.clear()
+
+    def _parse_lastmod(self, lastmod: str) -> Optional[datetime]:
+        try:
+            # ISO 8601 parsing
+            # lastmod might be YYYY-MM-DD or full datetime
+            if 'T' in lastmod:
+                dt = datetime.fromisoformat(lastmod.replace('Z', '+00:00'))
+            else:
+                dt = datetime.fromisoformat(lastmod)
+            
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt
+        except ValueError:
+            return None
+
+    def _poll_html(self, blog_url: str) -> Optional[List[RawEvent]]:
+        """
+        Returns None if the listing page can't be fetched or has no recognisable
+        articles, so a remembered HTML strategy gets rediscovered.
+        """
+        base = self._base_url(blog_url)
         
         try:
-            headers = {"User-Agent": "CryptoUpgradeMonitor/1.0"}
-            resp = requests.get(base, headers=headers, timeout=10)
+            resp = self.http.get(base)
             if resp.status_code != 200:
                 print(f"HTML fetch failed: {resp.status_code}")
-                return []
+                return None
             
+            # html.parser on purpose: lxml repairs malformed markup differently, which changes which links the heuristics pick
             soup = BeautifulSoup(resp.content, 'html.parser')
             events = []
             
@@ -233,7 +377,7 @@ class BlogRSSAgent(BaseWatcher):
             if not articles:
                 # Fallback: Look for <a> tags
                 # This leads to too much noise.
-                return []
+                return None
                 
             articles_processed = 0
             for article in articles:
@@ -283,81 +427,106 @@ class BlogRSSAgent(BaseWatcher):
 
         except Exception as e:
             print(f"HTML scraping error: {e}")
-            return []
+            return None
 
     def _fetch_page_metadata(self, url: str, timestamp: Optional[datetime]) -> Optional[RawEvent]:
         try:
-            resp = requests.get(url, timeout=5, headers={"User-Agent": "CryptoUpgradeMonitor/1.0"})
-            if resp.status_code != 200: return None
-            
-            soup = BeautifulSoup(resp.content, 'html.parser')
-            title = soup.title.string if soup.title else url
-            
-            # Description from meta
-            desc = ""
-            meta_desc = soup.find('meta', attrs={'name': 'description'}) or soup.find('meta', attrs={'property': 'og:description'})
-            if meta_desc:
-                desc = meta_desc.get('content', '')
+            page = self._get_page(url, timestamp)
+            if page is None: return None
             
             # Extract true published timestamp
-            published_time = timestamp
-            
-            # First try regex on ALL body text to find the earliest mentioned date
-            import re
-            body_text = soup.get_text(separator=' ')
-            body_text_clean = " ".join(body_text.split())
-            text = f"{title}: {desc}\n\n{body_text_clean[:4000]}"
-            
-            # We want to find all dates and take the earliest one that makes sense
-            matches = re.finditer(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2}, \d{4}', body_text)
-            
-            found_dates = []
-            for match in matches:
-                clean_date = match.group(0).replace("Sept", "Sep")
-                try:
-                    dt = datetime.strptime(clean_date, '%B %d, %Y').replace(tzinfo=timezone.utc)
-                    found_dates.append(dt)
-                except ValueError:
-                    try:
-                        dt = datetime.strptime(clean_date, '%b %d, %Y').replace(tzinfo=timezone.utc)
-                        found_dates.append(dt)
-                    except ValueError:
-                        pass
-            
-            # If we found dates, take the very first one (which corresponds to the article header before the body)
-            if found_dates:
-                published_time = found_dates[0]
-            
-            # Fallback to metadata ONLY if regex found absolutely nothing and we came in with no timestamp
-            if not published_time:
-                meta_date = soup.find('meta', attrs={'property': 'article:published_time'})
-                if meta_date:
-                    try:
-                        dt_str = meta_date.get('content', '').replace('Z', '+00:00')
-                        dt = datetime.fromisoformat(dt_str)
-                        if dt.tzinfo is None:
-                            dt = dt.replace(tzinfo=timezone.utc)
-                        published_time = dt
-                    except: pass
+            # The page's own publication date wins over the listing/sitemap timestamp
+            published_time = self._parse_iso(page["published_date"]) or timestamp
             
             # STRICT REQUIREMENT: If we still have no published_time here, it is not a blog post.
             if not published_time:
                 print(f"    [Filter] Discarding {url} - No valid publication date found.")
                 return None
             
-            # Enforce the date cursor again since the Regex might have shifted the date backwards.
+            # Enforce the date cursor again since the page date might have shifted the date backwards.
             if self.last_seen_cursor and published_time <= self.last_seen_cursor:
                 return None
 
-            return RawEvent(
+            return RawEvent.trusted(
                 project=self.project_name,
                 source_type=SourceType.BLOG,
                 author="unknown",
-                text=text,
+                text=page["text"],
                 url=url,
                 timestamp=published_time,
-                raw_data={"scraped": True}
+                # Main article for snippet selection; the event text stays the (capped) page body
+                raw_data={"scraped": True, "article_text": page["article"]}
             )
         except Exception as e:
             print(f"Error fetching metadata for {url}: {e}")
             return None
+
+    def _get_page(self, url: str, timestamp: Optional[datetime]) -> Optional[Dict[str, Any]]:
+        """
+        Returns the extracted page, going to the network and BeautifulSoup only when
+        the page cache can't vouch for it.
+        """
+        cached = self.page_cache.get(url)
+        source_lastmod = timestamp.isoformat() if timestamp else None
+
+        # Same sitemap/listing lastmod as last time: nothing can have changed
+        if cached and source_lastmod and cached["source_lastmod"] == source_lastmod:
+            self.page_cache.touch(url)
+            return cached
+
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        resp = self.http.get(url, headers=headers, timeout=5)
+        if resp.status_code == 304 and cached:
+            self.page_cache.touch(url, source_lastmod=source_lastmod)
+            return cached
+        if resp.status_code != 200: return None
+
+        validators = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "content_hash": hashlib.sha256(resp.content).hexdigest(),
+            "source_lastmod": source_lastmod
+        }
+        # A lastmod bump without a content change doesn't need a re-parse
+        if cached and cached["content_hash"] == validators["content_hash"]:
+            self.page_cache.touch(url, **validators)
+            return cached
+
+        page = self._extract_page(resp.content, url)
+        page.update(validators)
+        self.page_cache.put(url, page)
+        return page
+
+    def _extract_page(self, content: bytes, url: str) -> Dict[str, Any]:
+        # Single lxml pass for title, meta tags and text (falls back to BeautifulSoup without lxml)
+        fields = extract_page(content)
+        title = fields["title"] if fields["title"] is not None else url
+        
+        # Description from meta
+        desc = fields["description"]
+        
+        body_text_clean = " ".join(fields["body_text"].split())
+        text = f"{title}: {desc}\n\n{body_text_clean[:4000]}"
+        # Main content without nav bars, cookie banners and footers, for snippet selection; the whole page text if none was found
+        article = "\n\n".join(fields["article"]) or body_text_clean
+        
+        # Structured dates first (JSON-LD, article:published_time, <time>), header text last
+        published, date_source = extract_published_date(fields, body_text_clean)
+
+        return {
+            "title": str(title),
+            "description": desc,
+            "published_date": published.isoformat() if published else None,
+            "date_source": date_source,
+            "text": text,
+            "article": article
+        }
+
+    def _parse_iso(self, value: Optional[str]) -> Optional[datetime]:
+        return datetime.fromisoformat(value) if value else None
@@ -0,0 +1,111 @@
+import re
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# "January 5, 2024", "Jan 5, 2024", "Sept. 5, 2024"
+TEXT_DATE = re.compile(
+    r'\b(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sept?(?:ember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\b\.? (\d{1,2}),? (\d{4})\b'
+)
+# Only the start of the page counts as the article header; dates further down
+# belong to related posts, comments or the footer
+HEADER_REGION_CHARS = 3000
+
+# JSON-LD types whose datePublished is the article's own date
+ARTICLE_TYPES = {"article", "newsarticle", "blogposting", "techarticle", "report", "webpage"}
+
+def parse_iso_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Lenient ISO 8601 parse; naive values are taken as UTC.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+def _ld_nodes(data: Any) -> Iterator[Dict[str, Any]]:
+    # JSON-LD may be a single object, a list, or nest everything under @graph
+    if isinstance(data, list):
+        for item in data:
+            yield from _ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _ld_nodes(data["@graph"])
+
+def _ld_types(node: Dict[str, Any]) -> List[str]:
+    types = node.get("@type", [])
+    if isinstance(types, str):
+        types = [types]
+    return [t.lower() for t in types if isinstance(t, str)]
+
+def date_from_json_ld(blocks: List[str]) -> Optional[datetime]:
+    fallback = None
+    for block in blocks:
+        # Skip the JSON parse for blocks that can't contain a date (breadcrumbs, org info)
+        if "datePublished" not in block:
+            continue
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        for node in _ld_nodes(data):
+            dt = parse_iso_date(node.get("datePublished"))
+            if dt is None:
+                continue
+            if ARTICLE_TYPES.intersection(_ld_types(node)):
+                return dt
+            fallback = fallback or dt
+    return fallback
+
+def date_from_text(text: str) -> Optional[datetime]:
+    match = TEXT_DATE.search(text, 0, HEADER_REGION_CHARS)
+    if not match:
+        return None
+    month, day, year = match.groups()
+    try:
+        return datetime(int(year), MONTHS[month[:3].lower()], int(day), tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+def extract_published_date(fields: Dict[str, Any], text: Optional[str] = None) -> Tuple[Optional[datetime], Optional[str]]:
+    """
+    Publication date of a scraped page, from the fields returned by
+    html_extract.extract_page. Sources are tried from most to least reliable
+    and the first hit wins:
+
+    1. JSON-LD `datePublished`
+    2. `<meta property="article:published_time">`
+    3. the first `<time datetime>`
+    4. the first written-out date near the top of the body text (`text`,
+       whitespace-collapsed, defaults to the raw body text)
+
+    Returns `(date, source)`, or `(None, None)` when nothing matched.
+    """
+    dt = date_from_json_ld(fields.get("ld_json", []))
+    if dt:
+        return dt, "json_ld"
+
+    dt = parse_iso_date(fields.get("meta_properties", {}).get("article:published_time"))
+    if dt:
+        return dt, "meta"
+
+    for value in fields.get("times", []):
+        dt = parse_iso_date(value)
+        if dt:
+            return dt, "time"
+
+    dt = date_from_text(text if text is not None else fields.get("body_text", ""))
+    if dt:
+        return dt, "text"
+    return None, None
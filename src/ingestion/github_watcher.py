@@ -1,23 +1,176 @@
 import os
-import requests
-from typing import List, Dict, Any
+import json
+from typing import List, Dict, Any, Set, Optional, Tuple
 from datetime import datetime
 from src.models import RawEvent, ProjectConfig, SourceType
 from src.ingestion.base import BaseWatcher
+from src.ingestion.http_cache import ValidatorCache
+from src.ingestion.http_client import HttpClient
+from src.rate_limit import RateLimitDeferred
 
 class GitHubReleaseAgent(BaseWatcher):
-    def __init__(self, project_name: str, config: ProjectConfig):
-        super().__init__(project_name, config)
+    GRAPHQL_URL = "https://api.github.com/graphql"
+    REPOS_PER_ORG = 5
+    RELEASES_PER_REPO = 10
+    ORGS_PER_QUERY = 5
+    MAX_REPO_PAGES = 3
+
+    def __init__(self, project_name: str, config: ProjectConfig, http_cache: Optional[ValidatorCache] = None, http: Optional[HttpClient] = None):
+        super().__init__(project_name, config, http_cache, http)
         self.token = os.getenv("GITHUB_TOKEN")
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
         }
         if self.token:
             self.headers["Authorization"] = f"token {self.token}"
+        # GraphQL needs a token; without one we always use REST
+        self.api_mode = os.getenv("GITHUB_API_MODE", "graphql").lower()
+        # (url, response, keep_body) of responses parsed during the current poll
+        self.pending_validators: List[Tuple[str, Any, bool]] = []
+
+    def hosts(self) -> Set[str]:
+        return {"api.github.com"}
 
     def poll(self) -> List[RawEvent]:
+        orgs = list(self.config.github_orgs)
+        events = []
+        # Validators are only recorded once the whole poll succeeded. A deferred poll
+        # discards its events and keeps the cursor, so a 304 next cycle would skip them.
+        self.pending_validators = []
+        if self.api_mode == "graphql" and self.token:
+            try:
+                graphql_events, failed_orgs = self._poll_graphql(orgs)
+                events.extend(graphql_events)
+                orgs = failed_orgs
+            except RateLimitDeferred:
+                raise
+            except Exception as e:
+                print(f"GitHub GraphQL poll failed, falling back to REST: {e}")
+        if orgs:
+            events.extend(self._poll_rest(orgs))
+        for url, response, keep_body in self.pending_validators:
+            self.http_cache.record(url, response, keep_body=keep_body)
+        self.pending_validators = []
+
+        # Sort by timestamp ascending to update cursor correctly later
+        events.sort(key=lambda x: x.timestamp)
+        return events
+
+    def _poll_graphql(self, orgs: List[str]) -> Tuple[List[RawEvent], List[str]]:
+        """
+        Fetches the most recently pushed repos and their latest releases for
+        several orgs per query. Returns (events, orgs that need the REST fallback).
+        """
         events = []
-        for org in self.config.github_orgs:
+        failed = []
+        since = self.last_seen_cursor
+        for i in range(0, len(orgs), self.ORGS_PER_QUERY):
+            # org login -> repositories cursor (None for the first page)
+            pending: Dict[str, Optional[str]] = {org: None for org in orgs[i:i + self.ORGS_PER_QUERY]}
+            for _ in range(self.MAX_REPO_PAGES):
+                if not pending:
+                    break
+                data, errors = self._graphql_query(pending)
+                next_pending = {}
+                for idx, org in enumerate(pending):
+                    repos = (data.get(f"o{idx}") or {}).get("repositories")
+                    if repos is None:
+                        print(f"GitHub GraphQL returned no data for {org}: {errors}")
+                        failed.append(org)
+                        continue
+
+                    # Repos are ordered by pushedAt, but a release drafted earlier or cut from an
+                    # existing tag doesn't push; keep paging while a page still has anything new
+                    page_has_new = False
+                    for repo in repos.get("nodes") or []:
+                        pushed_at = self._parse_ts(repo.get("pushedAt"))
+                        if since and pushed_at and pushed_at > since:
+                            page_has_new = True
+                        for node in (repo.get("releases") or {}).get("nodes") or []:
+                            raw_event = self._release_event(self._rest_shape(node))
+                            if raw_event:
+                                events.append(raw_event)
+                                page_has_new = True
+
+                    # Only page further on incremental polls; the first poll looks at the top repos only
+                    page_info = repos.get("pageInfo") or {}
+                    if since and page_has_new and page_info.get("hasNextPage"):
+                        next_pending[org] = page_info.get("endCursor")
+                pending = next_pending
+        return events, failed
+
+    def _graphql_query(self, pending: Dict[str, Optional[str]]) -> Tuple[Dict[str, Any], Any]:
+        params = []
+        fields = []
+        variables: Dict[str, Any] = {"first": self.REPOS_PER_ORG, "releases": self.RELEASES_PER_REPO}
+        for idx, (org, cursor) in enumerate(pending.items()):
+            params.append(f"$org{idx}: String!, $after{idx}: String")
+            variables[f"org{idx}"] = org
+            variables[f"after{idx}"] = cursor
+            fields.append(f"""
+              o{idx}: organization(login: $org{idx}) {{
+                repositories(first: $first, after: $after{idx}, orderBy: {{field: PUSHED_AT, direction: DESC}}) {{
+                  pageInfo {{ hasNextPage endCursor }}
+                  nodes {{
+                    nameWithOwner
+                    pushedAt
+                    releases(first: $releases, orderBy: {{field: CREATED_AT, direction: DESC}}) {{
+                      nodes {{ name tagName description url publishedAt author {{ login }} }}
+                    }}
+                  }}
+                }}
+              }}""")
+        query = f"query($first: Int!, $releases: Int!, {', '.join(params)}) {{{''.join(fields)}\n}}"
+
+        headers = {"Authorization": f"bearer {self.token}"}
+        self.rate_limiter.acquire(self.GRAPHQL_URL, self.token, self.priority)
+        resp = self.http.post(self.GRAPHQL_URL, headers=headers, json={"query": query, "variables": variables})
+        resp.raise_for_status()
+        payload = resp.json()
+        return payload.get("data") or {}, payload.get("errors")
+
+    def _rest_shape(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        # Map a GraphQL release node onto the REST field names used everywhere else
+        return {
+            "name": node.get("name"),
+            "tag_name": node.get("tagName"),
+            "body": node.get("description") or "",
+            "html_url": node.get("url", ""),
+            "published_at": node.get("publishedAt"),
+            "author": node.get("author") or {},
+        }
+
+    def _parse_ts(self, value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        # Parse timestamp (ISO 8601)
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    def _release_event(self, release: Dict[str, Any]) -> Optional[RawEvent]:
+        published_at = self._parse_ts(release.get("published_at"))
+        if not published_at:
+            return None
+
+        # Cursor check
+        if self.last_seen_cursor and published_at <= self.last_seen_cursor:
+            return None
+
+        return RawEvent.trusted(
+            project=self.project_name,
+            source_type=SourceType.GITHUB,
+            author=(release.get("author") or {}).get("login", "unknown"),
+            text=f"Release {release.get('name', release.get('tag_name'))}: {release.get('body', '')}",
+            url=release.get("html_url", ""),
+            timestamp=published_at,
+            raw_data=release
+        )
+
+    def _poll_rest(self, orgs: List[str]) -> List[RawEvent]:
+        events = []
+        for org in orgs:
             # Note: This is a simplification. To get all releases for an org, 
             # we'd need to list repos first, or use the search API, or config should list specific repos.
             # For MVP, assuming config might list "Owner/Repo" strings or we just check key repos.
@@ -36,10 +189,23 @@ class GitHubReleaseAgent(BaseWatcher):
             # Let's iterate repos.
             
             repos_url = f"https://api.github.com/orgs/{org}/repos?sort=pushed&direction=desc&per_page=5"
+            # Conditional requests: a 304 from GitHub doesn't count against the rate limit
             try:
-                response = requests.get(repos_url, headers=self.headers)
-                response.raise_for_status()
-                repos = response.json()
+                self.rate_limiter.acquire(repos_url, self.token, self.priority)
+                response, not_modified = self.http_cache.fetch(repos_url, headers=self.headers, conditional=self.conditional)
+                cached = self.http_cache.cached_body(repos_url) if not_modified else None
+                if cached is not None:
+                    repos = json.loads(cached)
+                else:
+                    if not_modified:
+                        # Validators without a stored body; refetch unconditionally
+                        self.rate_limiter.acquire(repos_url, self.token, self.priority)
+                        response, _ = self.http_cache.fetch(repos_url, headers=self.headers, conditional=False)
+                    response.raise_for_status()
+                    repos = response.json()
+                    self.pending_validators.append((repos_url, response, True))
+            except RateLimitDeferred:
+                raise
             except Exception as e:
                 print(f"Error fetching repos for {org}: {e}")
                 continue
@@ -51,40 +217,23 @@ class GitHubReleaseAgent(BaseWatcher):
                 releases_url = f"https://api.github.com/repos/{full_name}/releases?per_page=10"
                 
                 try:
-                    r_resp = requests.get(releases_url, headers=self.headers)
+                    self.rate_limiter.acquire(releases_url, self.token, self.priority)
+                    r_resp, not_modified = self.http_cache.fetch(releases_url, headers=self.headers, conditional=self.conditional)
+                    if not_modified:
+                        # No new releases since the last poll
+                        continue
                     r_resp.raise_for_status()
                     releases = r_resp.json()
+                    self.pending_validators.append((releases_url, r_resp, False))
+                except RateLimitDeferred:
+                    raise
                 except Exception as e:
                     print(f"Error fetching releases for {full_name}: {e}")
                     continue
 
                 for release in releases:
-                    published_at_str = release.get("published_at")
-                    if not published_at_str:
-                        continue
-                    
-                    # Parse timestamp (ISO 8601)
-                    # Python 3.11+ can use fromisoformat 
-                    try:
-                        published_at = datetime.fromisoformat(published_at_str.replace('Z', '+00:00'))
-                    except ValueError:
-                        continue
-
-                    # Cursor check
-                    if self.last_seen_cursor and published_at <= self.last_seen_cursor:
-                        continue
-
-                    raw_event = RawEvent(
-                        project=self.project_name,
-                        source_type=SourceType.GITHUB,
-                        author=release.get("author", {}).get("login", "unknown"),
-                        text=f"Release {release.get('name', release.get('tag_name'))}: {release.get('body', '')}",
-                        url=release.get("html_url", ""),
-                        timestamp=published_at,
-                        raw_data=release
-                    )
-                    events.append(raw_event)
+                    raw_event = self._release_event(release)
+                    if raw_event:
+                        events.append(raw_event)
         
-        # Sort by timestamp ascending to update cursor correctly later
-        events.sort(key=lambda x: x.timestamp)
         return events
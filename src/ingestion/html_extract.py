@@ -0,0 +1,214 @@
+import re
+from typing import Dict, List, Optional, Any
+from bs4 import BeautifulSoup, UnicodeDammit
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Strings inside these tags are not page text (BeautifulSoup's get_text skips them too)
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>', re.IGNORECASE)
+LD_JSON_TYPE = "application/ld+json"
+
+# --- Main-content isolation ---
+# Preferred article containers, largest wins; the whole body otherwise
+CONTENT_XPATH = '//article | //main | //*[@role="main"]'
+CONTENT_TAGS = ["article", "main"]
+# Paragraph-level elements; only the innermost ones are kept so nested blocks aren't repeated
+BLOCK_TAGS = ["p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "td", "th", "dd", "dt", "figcaption"]
+# Page chrome: navigation, footers, cookie banners, share widgets, sidebars
+BOILERPLATE_TAGS = {"nav", "header", "footer", "aside", "form", "noscript", "button", "select", "svg", "iframe"}
+# Class/id tokens starting with one of these words ("cookie-banner", "share-buttons"), not "has-sidebar"
+BOILERPLATE_ATTR = re.compile(r'(?:^|\s)(?:cookie|consent|banner|newsletter|subscribe|share|social|related|comments?|breadcrumbs?|sidebar|menu|promo|navbar|footer)(?![a-z])', re.IGNORECASE)
+# A container whose paragraphs hold less text than this isn't the article
+MIN_ARTICLE_CHARS = 200
+
+def _page(title: Optional[str], meta_names: Dict[str, str], meta_properties: Dict[str, str], times: List[str], ld_json: List[str], body_text: str, article: Optional[List[str]] = None) -> Dict[str, Any]:
+    # Same precedence as before: <meta name="description">, then og:description
+    if "description" in meta_names:
+        description = meta_names["description"]
+    else:
+        description = meta_properties.get("og:description", "")
+    return {
+        "title": title,
+        "description": description,
+        "meta_names": meta_names,
+        "meta_properties": meta_properties,
+        "times": times,
+        "ld_json": ld_json,
+        "body_text": body_text,
+        # Main-content paragraphs, without navigation, banners and footers
+        "article": article or [],
+    }
+
+def _is_boilerplate(tag: str, attrs: Dict[str, Any]) -> bool:
+    if tag in BOILERPLATE_TAGS:
+        return True
+    classes = attrs.get("class") or ""
+    if isinstance(classes, list):
+        classes = " ".join(classes)
+    return bool(BOILERPLATE_ATTR.search(f"{classes} {attrs.get('id') or ''}"))
+
+def _choose_article(candidates: List[List[str]], body: List[str]) -> List[str]:
+    best = max(candidates, key=lambda paragraphs: sum(len(p) for p in paragraphs), default=[])
+    return best if sum(len(p) for p in best) >= MIN_ARTICLE_CHARS else body
+
+def _clean_paragraphs(texts: List[str]) -> List[str]:
+    paragraphs: List[str] = []
+    for text in texts:
+        text = " ".join(text.split())
+        if text and (not paragraphs or paragraphs[-1] != text):
+            paragraphs.append(text)
+    return paragraphs
+
+def _article_lxml(root) -> List[str]:
+    def paragraphs(container) -> List[str]:
+        texts = []
+        for el in container.iter(*BLOCK_TAGS):
+            # Innermost blocks only
+            if next(el.iterdescendants(*BLOCK_TAGS), None) is not None:
+                continue
+            # Chrome anywhere between the block and the container (the container's own classes don't count)
+            node, chrome = el, False
+            while node is not None and node is not container:
+                if isinstance(node.tag, str) and _is_boilerplate(node.tag, node.attrib):
+                    chrome = True
+                    break
+                node = node.getparent()
+            if not chrome:
+                texts.append(" ".join(t for t in el.xpath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")))
+        return _clean_paragraphs(texts)
+
+    body = root.find("body")
+    return _choose_article([paragraphs(c) for c in root.xpath(CONTENT_XPATH)], paragraphs(body if body is not None else root))
+
+def _article_soup(soup: BeautifulSoup) -> List[str]:
+    def paragraphs(container) -> List[str]:
+        texts = []
+        for el in container.find_all(BLOCK_TAGS):
+            if el.find(BLOCK_TAGS) is not None:
+                continue
+            chrome = _is_boilerplate(el.name, el.attrs)
+            for parent in el.parents:
+                if chrome or parent is container:
+                    break
+                chrome = _is_boilerplate(parent.name, parent.attrs)
+            if not chrome:
+                texts.append(el.get_text(separator=" "))
+        return _clean_paragraphs(texts)
+
+    candidates = soup.find_all(CONTENT_TAGS) + soup.find_all(attrs={"role": "main"})
+    return _choose_article([paragraphs(c) for c in candidates], paragraphs(soup.body or soup))
+
+def html_paragraphs(markup: str) -> List[str]:
+    """
+    Main-content paragraphs of an HTML fragment or page, e.g. a feed entry's content.
+    """
+    if not markup.strip():
+        return []
+    if HAS_LXML:
+        try:
+            return _article_lxml(lxml.html.document_fromstring(XML_DECLARATION.sub("", markup, count=1)))
+        except (etree.ParserError, ValueError):
+            pass
+    return _article_soup(BeautifulSoup(markup, 'html.parser'))
+
+def feed_entry_html(entry: Dict[str, Any]) -> str:
+    """
+    The HTML body of a feedparser entry (or its dict copy): the first
+    content block, else the summary.
+    """
+    content = entry.get('content') or []
+    if content:
+        return content[0].get('value', '') or ''
+    return entry.get('summary', '') or ''
+
+def extract_page_soup(content: bytes) -> Dict[str, Any]:
+    """
+    Reference extraction with BeautifulSoup's pure-Python parser.
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    title = soup.title.string if soup.title else None
+
+    meta_names: Dict[str, str] = {}
+    meta_properties: Dict[str, str] = {}
+    for tag in soup.find_all('meta'):
+        if tag.get('name') and tag.get('name') not in meta_names:
+            meta_names[tag.get('name')] = tag.get('content', '')
+        if tag.get('property') and tag.get('property') not in meta_properties:
+            meta_properties[tag.get('property')] = tag.get('content', '')
+    times = [t.get('datetime') for t in soup.find_all('time') if t.get('datetime')]
+    ld_json = [t.string or "" for t in soup.find_all('script', attrs={'type': LD_JSON_TYPE})]
+    return _page(title, meta_names, meta_properties, times, ld_json, soup.get_text(separator=' '), _article_soup(soup))
+
+def extract_page_lxml(content: bytes) -> Dict[str, Any]:
+    """
+    Fast path: a single lxml (libxml2) parse plus one walk over the tree that
+    collects the title, meta tags, <time> datetimes, JSON-LD blocks and text
+    strings. Decoding goes through the same UnicodeDammit step BeautifulSoup
+    uses, so the output matches extract_page_soup.
+    """
+    markup = UnicodeDammit(content, is_html=True).unicode_markup or ""
+    # lxml refuses str input that still carries an XML encoding declaration
+    markup = XML_DECLARATION.sub("", markup, count=1)
+    if not markup.strip():
+        return _page(None, {}, {}, [], [], "")
+    root = lxml.html.document_fromstring(markup)
+
+    title = None
+    title_seen = False
+    meta_names: Dict[str, str] = {}
+    meta_properties: Dict[str, str] = {}
+    times: List[str] = []
+    ld_json: List[str] = []
+    strings: List[str] = []
+    skip_depth = 0
+
+    for event, el in etree.iterwalk(root, events=("start", "end", "comment", "pi")):
+        if event in ("comment", "pi"):
+            # Comment text isn't page text, but the string after it is
+            if skip_depth == 0 and el.tail:
+                strings.append(el.tail)
+            continue
+
+        tag = el.tag
+        if event == "start":
+            if tag == "title" and not title_seen:
+                title_seen = True
+                # BeautifulSoup's .string is None unless the tag holds exactly one string
+                title = el.text if len(el) == 0 else None
+            elif tag == "meta":
+                if el.get("name") and el.get("name") not in meta_names:
+                    meta_names[el.get("name")] = el.get("content", "")
+                if el.get("property") and el.get("property") not in meta_properties:
+                    meta_properties[el.get("property")] = el.get("content", "")
+            elif tag == "time" and el.get("datetime"):
+                times.append(el.get("datetime"))
+            elif tag == "script" and el.get("type") == LD_JSON_TYPE:
+                ld_json.append(el.text or "")
+
+            if tag in SKIP_TEXT_TAGS:
+                skip_depth += 1
+            elif skip_depth == 0 and el.text:
+                strings.append(el.text)
+        else:
+            if tag in SKIP_TEXT_TAGS:
+                skip_depth -= 1
+            # The tail belongs to the parent, so it counts even after a skipped tag
+            if skip_depth == 0 and el.tail and el is not root:
+                strings.append(el.tail)
+
+    # Same as soup.get_text(separator=' ')
+    return _page(title, meta_names, meta_properties, times, ld_json, " ".join(strings), _article_lxml(root))
+
+def extract_page(content: bytes) -> Dict[str, Any]:
+    if HAS_LXML:
+        try:
+            return extract_page_lxml(content)
+        except (etree.ParserError, ValueError):
+            pass
+    return extract_page_soup(content)
@@ -0,0 +1,110 @@
+import os
+import json
+import threading
+import requests
+from typing import Dict, Optional, Tuple, Any
+from src.ingestion.http_client import HttpClient
+
+def cache_dir() -> str:
+    path = os.getenv("CACHE_DIR", ".cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+class ValidatorCache:
+    """
+    Persistent ETag / Last-Modified store for conditional GETs.
+
+    Watchers send the stored validators with their next request; a 304 means
+    the feed, sitemap or API response hasn't changed and can be skipped
+    without parsing. Validators are only recorded once a response has been
+    parsed successfully, so a 304 always refers to a known-good resource.
+    """
+    def __init__(self, path: Optional[str] = None, http: Optional[HttpClient] = None):
+        self.path = path or os.path.join(cache_dir(), "http_validators.json")
+        self.http = http or HttpClient()
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        self.reset_stats()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Error loading HTTP validator cache: {e}")
+            return {}
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.entries)
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving HTTP validator cache: {e}")
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        with self.lock:
+            entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, conditional: bool = True) -> Tuple[requests.Response, bool]:
+        """
+        GETs `url`, adding stored validators when `conditional` is set.
+        Returns (response, not_modified).
+        """
+        request_headers = dict(headers or {})
+        if conditional:
+            request_headers.update(self.conditional_headers(url))
+
+        resp = self.http.get(url, headers=request_headers, timeout=timeout)
+        not_modified = resp.status_code == 304
+        with self.lock:
+            self.requests += 1
+            if not_modified:
+                self.hits += 1
+                self.bytes_saved += self.entries.get(url, {}).get("size", 0)
+            else:
+                self.bytes_downloaded += len(resp.content)
+        return resp, not_modified
+
+    def record(self, url: str, resp: requests.Response, keep_body: bool = False):
+        """
+        Stores the validators of a successfully parsed 200 response.
+        With `keep_body` the body is kept too, for callers that need the
+        payload itself on a 304 (e.g. the GitHub repo listing).
+        """
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {"etag": etag, "last_modified": last_modified, "size": len(resp.content)}
+        if keep_body:
+            entry["body"] = resp.text
+        with self.lock:
+            self.entries[url] = entry
+
+    def cached_body(self, url: str) -> Optional[str]:
+        with self.lock:
+            return self.entries.get(url, {}).get("body")
+
+    def reset_stats(self):
+        self.requests = 0
+        self.hits = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+
+    def report(self) -> str:
+        rate = (self.hits / self.requests * 100) if self.requests else 0.0
+        return (f"[HTTP Cache] {self.hits}/{self.requests} conditional hits ({rate:.0f}%), "
+                f"{self.bytes_saved / 1024:.1f} KB saved, {self.bytes_downloaded / 1024:.1f} KB downloaded")
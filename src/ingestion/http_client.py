@@ -0,0 +1,87 @@
+import os
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from src.rate_limit import ApiRateLimiter
+
+def _accept_encoding() -> str:
+    # urllib3/httpx only decode brotli when a brotli package is installed
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            return "gzip, deflate, br"
+        except ImportError:
+            return "gzip, deflate"
+
+class HttpClient:
+    """
+    Shared HTTP layer for all watchers.
+
+    One pooled session is reused for every request so connections (TCP + TLS)
+    stay alive across page fetches to the same host. Every request gets the
+    same User-Agent, compression and a default timeout. With `http2=True` and
+    `httpx[http2]` installed, requests go through an HTTP/2 client instead.
+
+    Responses from rate-limited APIs are fed to `rate_limiter`, including
+    those made by tweepy through the shared session.
+    """
+    USER_AGENT = "CryptoUpgradeMonitor/1.0"
+
+    def __init__(self, timeout: Optional[float] = None, pool_size: Optional[int] = None, http2: Optional[bool] = None, rate_limiter: Optional[ApiRateLimiter] = None):
+        self.rate_limiter = rate_limiter or ApiRateLimiter()
+        self.timeout = timeout or float(os.getenv("HTTP_TIMEOUT", "10"))
+        pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", "10"))
+        if http2 is None:
+            http2 = os.getenv("HTTP2", "0") == "1"
+
+        self.default_headers = {
+            "User-Agent": self.USER_AGENT,
+            "Accept-Encoding": _accept_encoding(),
+        }
+
+        # requests keeps one connection pool per host; pool_connections is how many hosts stay cached
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.default_headers)
+        self.session.hooks["response"].append(self._on_response)
+
+        self.http2_client = None
+        if http2:
+            try:
+                import httpx
+                self.http2_client = httpx.Client(
+                    http2=True,
+                    headers=self.default_headers,
+                    timeout=self.timeout,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=pool_size * 8, max_keepalive_connections=pool_size * 4),
+                    event_hooks={"response": [self._on_response]}
+                )
+            except ImportError:
+                print("HTTP2=1 but httpx[http2] is not installed. Falling back to HTTP/1.1.")
+
+    def _on_response(self, resp, *args, **kwargs):
+        url = str(resp.request.url)
+        if self.rate_limiter.handles(url):
+            self.rate_limiter.observe(url, resp.request.headers.get("Authorization"), resp.headers, resp.status_code)
+        return resp
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None):
+        if self.http2_client is not None:
+            return self.http2_client.get(url, headers=headers, timeout=timeout or self.timeout)
+        return self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+
+    def post(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, **kwargs):
+        if self.http2_client is not None:
+            return self.http2_client.post(url, headers=headers, timeout=timeout or self.timeout, **kwargs)
+        return self.session.post(url, headers=headers, timeout=timeout or self.timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
+        if self.http2_client is not None:
+            self.http2_client.close()
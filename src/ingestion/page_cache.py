@@ -0,0 +1,94 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional, Any
+from src.ingestion.http_cache import cache_dir
+
+class PageCache:
+    """
+    Bounded on-disk cache of extracted article metadata, keyed by URL.
+
+    Each entry keeps the HTTP validators, a hash of the raw HTML and the
+    sitemap/listing lastmod the page was fetched for, so a repeat lookup can be
+    answered without the network (same lastmod), with a 304 (same validators)
+    or without re-parsing (same content hash). Least recently used entries are
+    evicted once `max_entries` is exceeded.
+    """
+    # Bump when the extraction logic changes so stale extractions are ignored
+    EXTRACT_VERSION = 4
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.path = path or os.path.join(cache_dir(), "pages.sqlite")
+        self.max_entries = max_entries or int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "5000"))
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                version INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                source_lastmod TEXT,
+                title TEXT,
+                description TEXT,
+                published_date TEXT,
+                date_source TEXT,
+                text TEXT,
+                article TEXT,
+                accessed_at REAL
+            )
+        """)
+        # Caches created by older versions lack newer columns; their rows are ignored via `version`
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        for column in ("published_date", "date_source", "article"):
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            cur = self.conn.execute("SELECT * FROM pages WHERE url = ? AND version = ?", (url, self.EXTRACT_VERSION))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cur.description], row))
+
+    def touch(self, url: str, **fields):
+        """
+        Marks an entry as used (LRU) and updates validator/lastmod fields.
+        """
+        fields["accessed_at"] = time.time()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self.lock:
+            self.hits += 1
+            self.conn.execute(f"UPDATE pages SET {assignments} WHERE url = ?", (*fields.values(), url))
+            self.conn.commit()
+
+    def put(self, url: str, page: Dict[str, Any]):
+        row = dict(page, url=url, version=self.EXTRACT_VERSION, accessed_at=time.time())
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        with self.lock:
+            self.misses += 1
+            self.conn.execute(f"INSERT OR REPLACE INTO pages ({columns}) VALUES ({placeholders})", tuple(row.values()))
+            # LRU eviction
+            self.conn.execute("""
+                DELETE FROM pages WHERE url IN (
+                    SELECT url FROM pages ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.conn.commit()
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"[Page Cache] {self.hits}/{total} page lookups served from cache ({rate:.0f}%)"
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
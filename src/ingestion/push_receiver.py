@@ -0,0 +1,279 @@
+import os
+import hmac
+import time
+import hashlib
+import secrets
+import threading
+import json
+import urllib.parse
+import feedparser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, NamedTuple, Optional
+from src.models import RawEvent
+from src.ingestion.base import BaseWatcher
+from src.ingestion.blog_watcher import BlogRSSAgent
+from src.ingestion.github_watcher import GitHubReleaseAgent
+from src.ingestion.http_client import HttpClient
+
+class Subscription(NamedTuple):
+    watcher: BlogRSSAgent
+    blog_url: str
+    hub: str
+    topic: str
+    secret: str
+    # 0 until the hub has verified the subscription
+    expires_at: float
+
+class PushReceiver:
+    """
+    Embedded HTTP endpoint for push notifications, so sources that support
+    push are picked up within seconds instead of on the next poll.
+
+    - WebSub: feeds that advertise a hub (`<link rel="hub">`, recorded during
+      feed discovery) are subscribed with a per-subscription secret. The hub's
+      verification GET is answered with the challenge, and notification POSTs
+      must carry a matching `X-Hub-Signature` HMAC.
+    - GitHub: `release` webhooks for the registry's orgs, signed with
+      `GITHUB_WEBHOOK_SECRET` (`X-Hub-Signature-256`).
+
+    Pushed events are queued for the main loop. While push is active for all
+    of a watcher's sources, `schedule["push_until"]` tells the scheduler to
+    fall back to its slowest polling cadence.
+    """
+    WEBSUB_PATH = "/websub/"
+    GITHUB_PATH = "/github"
+    # Renew WebSub leases this long before they expire
+    RENEW_MARGIN = 24 * 3600
+    # GitHub webhooks have no lease; trust them while deliveries keep arriving
+    GITHUB_PUSH_TTL = 7 * 24 * 3600
+    MAX_BODY = 5 * 1024 * 1024
+
+    def __init__(self, watchers: List[BaseWatcher], http: Optional[HttpClient] = None, port: Optional[int] = None, host: Optional[str] = None, public_url: Optional[str] = None, github_secret: Optional[str] = None, lease_seconds: Optional[int] = None):
+        self.http = http or HttpClient()
+        self.port = port if port is not None else int(os.getenv("PUSH_RECEIVER_PORT", "8080"))
+        self.host = host or os.getenv("PUSH_RECEIVER_HOST", "0.0.0.0")
+        # Where hubs can reach us; without it we can't subscribe, but GitHub webhooks still work
+        self.public_url = (public_url or os.getenv("PUSH_PUBLIC_URL", "")).rstrip("/")
+        self.github_secret = github_secret or os.getenv("GITHUB_WEBHOOK_SECRET", "")
+        self.lease_seconds = lease_seconds or int(os.getenv("WEBSUB_LEASE_SECONDS", "864000"))
+
+        self.blog_watchers = [w for w in watchers if isinstance(w, BlogRSSAgent)]
+        self.github_by_org: Dict[str, GitHubReleaseAgent] = {}
+        for w in watchers:
+            if isinstance(w, GitHubReleaseAgent):
+                for org in w.config.github_orgs:
+                    self.github_by_org[org.lower()] = w
+        self.github_seen: Dict[str, float] = {}
+
+        # callback token -> subscription
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.lock = threading.Lock()
+        self.pending: List[RawEvent] = []
+        self.arrived = threading.Event()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    # --- Lifecycle ---
+
+    def start(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                receiver._handle(self, "GET")
+
+            def do_POST(self):
+                receiver._handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"[Push] Receiver listening on {self.host}:{self.server.server_address[1]}")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Sleeps up to `timeout` seconds, returning early (True) once pushed events are waiting.
+        """
+        return self.arrived.wait(timeout)
+
+    def drain(self) -> List[RawEvent]:
+        with self.lock:
+            events, self.pending = self.pending, []
+            self.arrived.clear()
+        return events
+
+    def _enqueue(self, events: List[RawEvent]):
+        if not events:
+            return
+        with self.lock:
+            self.pending.extend(events)
+            self.arrived.set()
+
+    # --- WebSub subscriptions ---
+
+    def renew(self):
+        """
+        Subscribes to every discovered hub that we aren't subscribed to yet, or
+        whose lease is about to run out. Call once per cycle.
+        """
+        if not self.public_url:
+            return
+        now = time.time()
+        with self.lock:
+            current = {(s.watcher.watcher_id, s.blog_url): (token, s) for token, s in self.subscriptions.items()}
+        for watcher in self.blog_watchers:
+            for blog_url in watcher.config.blogs:
+                record = watcher.feed_discovery.get(blog_url) or {}
+                hub, topic = record.get("hub"), record.get("topic")
+                if not hub or not topic:
+                    continue
+                existing = current.get((watcher.watcher_id, blog_url))
+                if existing:
+                    token, sub = existing
+                    if sub.topic == topic and (sub.expires_at == 0 or sub.expires_at - now > self.RENEW_MARGIN):
+                        continue
+                    with self.lock:
+                        self.subscriptions.pop(token, None)
+                self._subscribe(watcher, blog_url, hub, topic)
+
+    def _subscribe(self, watcher: BlogRSSAgent, blog_url: str, hub: str, topic: str):
+        token = secrets.token_urlsafe(16)
+        secret = secrets.token_hex(32)
+        with self.lock:
+            self.subscriptions[token] = Subscription(watcher, blog_url, hub, topic, secret, 0.0)
+        try:
+            resp = self.http.post(hub, data={
+                "hub.mode": "subscribe",
+                "hub.topic": topic,
+                "hub.callback": f"{self.public_url}{self.WEBSUB_PATH}{token}",
+                "hub.secret": secret,
+                "hub.lease_seconds": str(self.lease_seconds),
+            })
+            if resp.status_code not in (202, 204):
+                raise ValueError(f"HTTP {resp.status_code}")
+            print(f"[Push] Requested WebSub subscription for {topic} via {hub}")
+        except Exception as e:
+            print(f"[Push] WebSub subscribe to {hub} failed: {e}")
+            with self.lock:
+                self.subscriptions.pop(token, None)
+
+    def _mark_blog_push(self, watcher: BlogRSSAgent):
+        # Only slow polling down when every blog of the watcher is covered by a verified lease
+        with self.lock:
+            expiries = {s.blog_url: s.expires_at for s in self.subscriptions.values() if s.watcher is watcher and s.expires_at}
+        if all(b in expiries for b in watcher.config.blogs):
+            watcher.schedule["push_until"] = min(expiries.values()) - self.RENEW_MARGIN
+
+    # --- Request handling ---
+
+    def _handle(self, request: BaseHTTPRequestHandler, method: str):
+        parsed = urllib.parse.urlparse(request.path)
+        try:
+            if parsed.path.startswith(self.WEBSUB_PATH):
+                token = parsed.path[len(self.WEBSUB_PATH):]
+                if method == "GET":
+                    return self._websub_verify(request, token, urllib.parse.parse_qs(parsed.query))
+                return self._websub_notify(request, token)
+            if parsed.path == self.GITHUB_PATH and method == "POST" and self.github_secret:
+                return self._github_webhook(request)
+        except Exception as e:
+            print(f"[Push] Error handling {method} {parsed.path}: {e}")
+            return self._respond(request, 500)
+        self._respond(request, 404)
+
+    def _respond(self, request: BaseHTTPRequestHandler, status: int, body: bytes = b""):
+        request.send_response(status)
+        request.send_header("Content-Type", "text/plain")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def _read_body(self, request: BaseHTTPRequestHandler) -> bytes:
+        length = int(request.headers.get("Content-Length") or 0)
+        if length > self.MAX_BODY:
+            raise ValueError(f"body too large ({length} bytes)")
+        return request.rfile.read(length)
+
+    def _websub_verify(self, request: BaseHTTPRequestHandler, token: str, params: Dict[str, List[str]]):
+        mode = params.get("hub.mode", [""])[0]
+        topic = params.get("hub.topic", [""])[0]
+        challenge = params.get("hub.challenge", [""])[0]
+        with self.lock:
+            sub = self.subscriptions.get(token)
+        if mode == "denied":
+            print(f"[Push] Hub denied subscription for {topic}: {params.get('hub.reason', [''])[0]}")
+            with self.lock:
+                self.subscriptions.pop(token, None)
+            return self._respond(request, 200)
+        # Only confirm subscriptions we actually asked for
+        if not sub or sub.topic != topic or mode not in ("subscribe", "unsubscribe") or not challenge:
+            return self._respond(request, 404)
+        if mode == "subscribe":
+            lease = int(params.get("hub.lease_seconds", [str(self.lease_seconds)])[0] or self.lease_seconds)
+            with self.lock:
+                self.subscriptions[token] = sub._replace(expires_at=time.time() + lease)
+            self._mark_blog_push(sub.watcher)
+            print(f"[Push] WebSub subscription verified for {topic} ({lease / 3600:.0f}h lease)")
+        self._respond(request, 200, challenge.encode())
+
+    def _websub_notify(self, request: BaseHTTPRequestHandler, token: str):
+        body = self._read_body(request)
+        with self.lock:
+            sub = self.subscriptions.get(token)
+        if not sub:
+            return self._respond(request, 410)
+        # WebSub: "sha1=<hex>" (or sha256/384/512); invalid signatures are acknowledged but ignored
+        method, _, signature = (request.headers.get("X-Hub-Signature") or "").partition("=")
+        if method not in ("sha1", "sha256", "sha384", "sha512") or not hmac.compare_digest(
+            hmac.new(sub.secret.encode(), body, method).hexdigest(), signature
+        ):
+            print(f"[Push] Ignoring WebSub notification with a bad signature for {sub.topic}")
+            return self._respond(request, 202)
+
+        feed = feedparser.parse(body)
+        events = [e for e in (sub.watcher._parse_feed_entry(entry) for entry in feed.entries) if e is not None]
+        print(f"[Push] WebSub notification for {sub.topic}: {len(events)} new events")
+        self._enqueue(events)
+        self._respond(request, 202)
+
+    def _github_webhook(self, request: BaseHTTPRequestHandler):
+        body = self._read_body(request)
+        expected = "sha256=" + hmac.new(self.github_secret.encode(), body, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, request.headers.get("X-Hub-Signature-256") or ""):
+            return self._respond(request, 401)
+
+        payload: Dict[str, Any] = json.loads(body or b"{}")
+        org = ((payload.get("organization") or {}).get("login")
+               or ((payload.get("repository") or {}).get("owner") or {}).get("login") or "").lower()
+        watcher = self.github_by_org.get(org)
+        if not watcher:
+            return self._respond(request, 202)
+
+        kind = request.headers.get("X-GitHub-Event")
+        # Only a hook that delivers releases can stand in for polling; stars, pushes or
+        # a ping from a hook without the release event say nothing about releases
+        hook_events = (payload.get("hook") or {}).get("events") or []
+        if kind == "release" or (kind == "ping" and ("release" in hook_events or "*" in hook_events)):
+            self._mark_github_push(watcher, org)
+
+        if kind == "release" and payload.get("action") == "published":
+            event = watcher._release_event(payload.get("release") or {})
+            if event:
+                print(f"[Push] GitHub release webhook for {org}: {event.url}")
+                self._enqueue([event])
+        self._respond(request, 202)
+
+    def _mark_github_push(self, watcher: GitHubReleaseAgent, org: str):
+        now = time.time()
+        with self.lock:
+            self.github_seen[org] = now
+            seen = [self.github_seen.get(o.lower()) for o in watcher.config.github_orgs]
+        if all(seen):
+            watcher.schedule["push_until"] = min(seen) + self.GITHUB_PUSH_TTL
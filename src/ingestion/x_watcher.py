@@ -1,26 +1,61 @@
 import os
 import tweepy
-from typing import List
+from typing import List, Set, Optional, Dict, Any
 from datetime import datetime, timezone
 from src.models import RawEvent, ProjectConfig, SourceType
 from src.ingestion.base import BaseWatcher
+from src.ingestion.http_cache import ValidatorCache
+from src.ingestion.http_client import HttpClient
+from src.rate_limit import RateLimitDeferred
 
 class XWatcherAgent(BaseWatcher):
-    def __init__(self, project_name: str, config: ProjectConfig):
-        super().__init__(project_name, config)
+    API_URL = "https://api.twitter.com/2"
+
+    def __init__(self, project_name: str, config: ProjectConfig, http_cache: Optional[ValidatorCache] = None, http: Optional[HttpClient] = None):
+        super().__init__(project_name, config, http_cache, http)
         
         # Authentication
         # Using OAuth 2.0 Bearer Token (App-only) is usually sufficient for reading public tweets 
         # but X API v2 access levels vary. Assuming Basic/Pro access.
         self.bearer_token = os.getenv("X_BEARER_TOKEN")
         self.client = None
+        # username (lowercase) -> user ID, and -> newest tweet ID seen
+        self.user_ids: Dict[str, str] = {}
+        self.since_ids: Dict[str, str] = {}
         
         if self.bearer_token:
             self.client = tweepy.Client(bearer_token=self.bearer_token)
+            # Reuse the shared keep-alive session instead of tweepy's private one
+            self.client.session = self.http.session
         else:
              # Fallback to consumer keys if needed, or just warn
              pass
 
+    def hosts(self) -> Set[str]:
+        return {"api.twitter.com"}
+
+    def get_state(self) -> Dict[str, Any]:
+        return {**super().get_state(), "user_ids": self.user_ids, "since_ids": self.since_ids}
+
+    def load_state(self, state: Dict[str, Any]):
+        super().load_state(state)
+        self.user_ids = dict(state.get("user_ids", {}))
+        self.since_ids = dict(state.get("since_ids", {}))
+
+    def _resolve_user_ids(self, usernames: List[str]):
+        """
+        Looks up user IDs we haven't cached yet, up to 100 per request.
+        """
+        missing = [u for u in usernames if u.lower() not in self.user_ids]
+        for i in range(0, len(missing), 100):
+            batch = missing[i:i + 100]
+            self.rate_limiter.acquire(f"{self.API_URL}/users/by", self.bearer_token, self.priority)
+            resp = self.client.get_users(usernames=batch)
+            for user in resp.data or []:
+                self.user_ids[user.username.lower()] = str(user.id)
+            for error in resp.errors or []:
+                print(f"User lookup failed: {error.get('detail', error)}")
+
     def poll(self) -> List[RawEvent]:
         if not self.client:
             print(f"XWatcherAgent for {self.project_name}: No valid credentials.")
@@ -28,45 +63,56 @@ class XWatcherAgent(BaseWatcher):
 
         events = []
         # X API v2 limits are strict.
-        # We need to look up User IDs from usernames first (can be cached), then get timeline.
-        # For efficiency in MVP, we might only poll the first few accounts.
-        
+        # User IDs are resolved once in a batch and kept in the state store, and each
+        # timeline is polled with a since_id cursor so only new tweets come back.
+        usernames = [h.lstrip('@') for h in self.config.x_accounts]
+        try:
+            self._resolve_user_ids(usernames)
+        except RateLimitDeferred:
+            raise
+        except Exception as e:
+            print(f"Error resolving X user IDs for {self.project_name}: {e}")
+
+        # Only commit new since_ids once the whole poll succeeded, or deferred tweets would be skipped
+        new_since_ids = {}
         for handle in self.config.x_accounts:
             username = handle.lstrip('@')
+            user_id = self.user_ids.get(username.lower())
+            if not user_id:
+                print(f"User {username} not found")
+                continue
             try:
-                # 1. Get User ID (Cache this in production!)
-                user = self.client.get_user(username=username)
-                if not user.data:
-                    print(f"User {username} not found")
-                    continue
-                user_id = user.data.id
-
-                # 2. Get User Tweets
                 # exclude=['retweets', 'replies'] might be good to reduce noise, but sometimes upgrades are in threads.
                 # Let's include everything but filter later? Or just exclude replies.
-                # start_time needs to be RFC3339 string.
-                
-                start_time = None
-                if self.last_seen_cursor:
-                    start_time = self.last_seen_cursor.isoformat()
+                params = {}
+                since_id = self.since_ids.get(username.lower())
+                if since_id:
+                    params["since_id"] = since_id
+                elif self.last_seen_cursor:
+                    # No per-account cursor yet; tweepy formats the datetime as RFC3339
+                    params["start_time"] = self.last_seen_cursor
 
+                self.rate_limiter.acquire(f"{self.API_URL}/users/{user_id}/tweets", self.bearer_token, self.priority)
                 tweets = self.client.get_users_tweets(
                     id=user_id,
                     max_results=5, # Minimal for polling
                     exclude=['replies'],
-                    tweet_fields=['created_at', 'author_id', 'text']
+                    tweet_fields=['created_at', 'author_id', 'text'],
+                    **params
                 )
 
                 if not tweets.data:
                     continue
 
+                new_since_ids[username.lower()] = str(max(int(t.id) for t in tweets.data))
+
                 for tweet in tweets.data:
                     created_at = tweet.created_at # Tweepy returns datetime (aware)
                     
                     if self.last_seen_cursor and created_at <= self.last_seen_cursor:
                         continue
                         
-                    raw_event = RawEvent(
+                    raw_event = RawEvent.trusted(
                         project=self.project_name,
                         source_type=SourceType.X,
                         author=handle,
@@ -77,9 +123,18 @@ class XWatcherAgent(BaseWatcher):
                     )
                     events.append(raw_event)
 
+            except RateLimitDeferred:
+                raise
+            except tweepy.NotFound:
+                # Account renamed or deleted; look it up again next cycle
+                print(f"User {username} not found")
+                self.user_ids.pop(username.lower(), None)
+                self.since_ids.pop(username.lower(), None)
+                continue
             except Exception as e:
                 print(f"Error polling X for {username}: {e}")
                 continue
 
+        self.since_ids.update(new_since_ids)
         events.sort(key=lambda x: x.timestamp)
         return events
@@ -1,6 +1,7 @@
 import os
 import yaml
 import time
+import asyncio
 from datetime import datetime, timedelta
 from datetime import datetime
 from dotenv import load_dotenv
@@ -12,7 +13,16 @@ from src.models import SourceRegistry, RawEvent, ProjectConfig
 from src.ingestion.github_watcher import GitHubReleaseAgent
 from src.ingestion.blog_watcher import BlogRSSAgent
 from src.ingestion.x_watcher import XWatcherAgent
-from src.analysis.relevance import RelevanceClassifierAgent
+from src.ingestion.engine import IngestionEngine
+from src.ingestion.http_cache import ValidatorCache
+from src.ingestion.http_client import HttpClient
+from src.scheduler import PollScheduler
+from src.pipeline import StreamingPipeline
+from src.ingestion.push_receiver import PushReceiver
+from src.ingestion.page_cache import PageCache
+from src.analysis.relevance import RelevanceClassifierAgent, CascadeRelevanceAgent
+from src.analysis.local_classifier import LocalRelevanceClassifier
+from src.analysis.dedup import NearDuplicateIndex
 from src.analysis.status import UpgradeStatusAgent
 from src.analysis.verification import VerificationAgent
 from src.synthesis.canonical import UpgradeCanonicalizerAgent
@@ -32,6 +42,12 @@ def main():
     state_manager = StateManager()
     output_manager = OutputManager()
     
+    # Pooled keep-alive HTTP client and conditional-request (ETag / Last-Modified) cache shared by all watchers
+    http_client = HttpClient()
+    http_cache = ValidatorCache(http=http_client)
+    # Extracted article metadata for sitemap/HTML scraped blogs
+    page_cache = PageCache()
+
     # Initialize Agents
     watchers = []
     print("Initializing Watchers & Restoring State...")
@@ -39,136 +55,156 @@ def main():
         # Create watchers
         project_watchers = []
         if config.github_orgs:
-            project_watchers.append(GitHubReleaseAgent(project_name, config))
+            project_watchers.append(GitHubReleaseAgent(project_name, config, http_cache=http_cache, http=http_client))
         if config.blogs:
-            project_watchers.append(BlogRSSAgent(project_name, config))
+            project_watchers.append(BlogRSSAgent(project_name, config, http_cache=http_cache, http=http_client, page_cache=page_cache))
         if config.x_accounts and os.getenv("X_BEARER_TOKEN"):
-            project_watchers.append(XWatcherAgent(project_name, config))
+            project_watchers.append(XWatcherAgent(project_name, config, http_cache=http_cache, http=http_client))
             
         # Restore State
         for w in project_watchers:
-            watcher_id = f"{w.project_name}_{w.__class__.__name__}"
-            cursor = state_manager.get_cursor(watcher_id)
+            cursor = state_manager.get_cursor(w.watcher_id)
             if cursor:
                 w.last_seen_cursor = cursor
-                print(f"  [{watcher_id}] Restored cursor: {cursor}")
+                print(f"  [{w.watcher_id}] Restored cursor: {cursor}")
+            w.load_state(state_manager.get_watcher_state(w.watcher_id))
             watchers.append(w)
+
+    # Concurrency caps for the ingestion engine. INGESTION_MAX_CONCURRENCY=1 polls sequentially.
+    engine = IngestionEngine(
+        max_concurrency=int(os.getenv("INGESTION_MAX_CONCURRENCY", "16")),
+        max_per_host=int(os.getenv("INGESTION_MAX_PER_HOST", "4"))
+    )
             
+    # Trained on logged Gemini verdicts (python -m src.analysis.local_classifier); None until then
+    local_model = LocalRelevanceClassifier.load()
+    if local_model:
+        print(f"Loaded local relevance classifier ({local_model.meta.get('records', '?')} verdicts, trained {local_model.meta.get('trained_at', '?')})")
+
     # Initialize Analysis Agents
     if os.getenv("GOOGLE_API_KEY"):
         print("Initializing AI Agents (Gemini Pro)...")
         from src.analysis.llm_agents import LLMRelevanceAgent, LLMVerificationAgent
-        relevance_agent = LLMRelevanceAgent()
-        verification_agent = LLMVerificationAgent()
+        from src.analysis.llm_cache import LLMCache
+        from src.analysis.llm_executor import LLMExecutor
+        from src.analysis.llm_telemetry import LLMTelemetry
+        from src.analysis.snippets import SnippetSelector
+        # Identical prompts (restarts, cursor resets, re-emitted posts) are answered from disk
+        llm_cache = LLMCache()
+        # One pool and one RPM/TPM budget for every Gemini call
+        llm_executor = LLMExecutor()
+        # Per-call latency / token metrics, appended to .cache/llm_metrics.jsonl every cycle
+        llm_telemetry = LLMTelemetry()
+        # Main-content passages with the most upgrade/governance/tokenomics signal, within a token budget
+        snippets = SnippetSelector()
+        # Events whose Gemini call fails after all retries are classified locally
+        llm_relevance = LLMRelevanceAgent(cache=llm_cache, executor=llm_executor, telemetry=llm_telemetry, snippets=snippets,
+                                          fallback=local_model or RelevanceClassifierAgent())
+        verification_agent = LLMVerificationAgent(cache=llm_cache, executor=llm_executor, telemetry=llm_telemetry, snippets=snippets)
     else:
         print("Initializing Heuristic Agents...")
-        relevance_agent = RelevanceClassifierAgent()
+        llm_cache = None
+        llm_telemetry = None
+        llm_relevance = None
         verification_agent = VerificationAgent()
 
+    # RELEVANCE_MODE: llm (LLM only), cascade (heuristic gate, then LLM), local (trained model) or heuristic (keywords)
+    relevance_mode = os.getenv("RELEVANCE_MODE", "llm" if llm_relevance else "local" if local_model else "heuristic").lower()
+    if relevance_mode in ("cascade", "llm") and not llm_relevance:
+        print(f"RELEVANCE_MODE={relevance_mode} needs GOOGLE_API_KEY; using {'local' if local_model else 'heuristic'} relevance")
+        relevance_mode = "local" if local_model else "heuristic"
+    if relevance_mode == "local" and not local_model:
+        print("RELEVANCE_MODE=local needs a trained model (python -m src.analysis.local_classifier); using heuristic relevance")
+        relevance_mode = "heuristic"
+    relevance_gate = None
+    if relevance_mode == "llm":
+        relevance_agent = llm_relevance
+    elif relevance_mode == "cascade":
+        relevance_gate = CascadeRelevanceAgent(RelevanceClassifierAgent(), llm_relevance)
+        relevance_agent = relevance_gate
+    elif relevance_mode == "local":
+        relevance_agent = local_model
+    else:
+        relevance_agent = RelevanceClassifierAgent()
+    print(f"Relevance mode: {relevance_mode}")
+
     status_agent = UpgradeStatusAgent()
     canonicalizer = UpgradeCanonicalizerAgent()
 
+    # Each watcher is polled on its own learned cadence instead of a fixed hourly sweep
+    scheduler = PollScheduler(watchers)
+
+    # Reposts and re-emitted posts reuse earlier relevance verdicts instead of being classified again
+    dedup_index = NearDuplicateIndex()
+
+    pipeline = StreamingPipeline(
+        registry, engine, scheduler, state_manager, output_manager,
+        relevance_agent, verification_agent, status_agent, canonicalizer,
+        dedup=dedup_index
+    )
+
+    # Optional WebSub / GitHub webhook endpoint; pushed events skip the wait for the next poll
+    receiver = None
+    if os.getenv("PUSH_RECEIVER_PORT"):
+        receiver = PushReceiver(watchers, http=http_client)
+        receiver.start()
+
+    def wait_for_work(seconds: float):
+        if receiver:
+            receiver.wait(seconds)
+        else:
+            time.sleep(seconds)
+
     # Polling Loop
     while True:
-        print("\n--- Polling Cycle ---")
-        all_events: List[RawEvent] = []
-        
-        # 1. Ingestion
-        for watcher in watchers:
-            try:
-                new_events = watcher.poll()
-                if new_events:
-                    print(f"Found {len(new_events)} events from {watcher.__class__.__name__} for {watcher.project_name}")
-                    all_events.extend(new_events)
-                    
-                    # Update State
-                    sorted_events = sorted(new_events, key=lambda x: x.timestamp)
-                    latest_ts = sorted_events[-1].timestamp
-                    watcher.update_cursor(latest_ts)
-                    
-                    watcher_id = f"{watcher.project_name}_{watcher.__class__.__name__}"
-                    state_manager.update_cursor(watcher_id, latest_ts)
-            except Exception as e:
-                print(f"Error polling {watcher.__class__.__name__}: {e}")
-
-        # 2. Filtering & Analysis
-        project_events: Dict[str, List[RawEvent]] = {}
-        event_subtypes: Dict[str, List[Any]] = {}
-        for event in all_events:
-            try:
-                # Check relevance
-                project_cfg = registry.projects.get(event.project)
-                signals = relevance_agent.classify(event, project_config=project_cfg)
-                if not signals.is_relevant:
-                    print(f"[{event.project}] Event dropped by relevance agent (No direct token functionality impact found): {event.url}")
-                    continue
-                
-                event_subtypes[str(event.event_id)] = signals.affected_subtypes
-
-                if event.project not in project_events:
-                    project_events[event.project] = []
-                project_events[event.project].append(event)
-            except Exception as e:
-                print(f"Analysis error: {e}")
-
-        # 3. Clustering & Verification
-        # Group by Project -> Clusters (Time-based sliding window)
-        # Events for a project within 24 hours of each other are considered part of the same "Upgrade Candidates".
-        
-        for project, events in project_events.items():
-            if not events:
-                continue
-
-            # Sort events by time
-            events.sort(key=lambda x: x.timestamp)
-            
-            # Create clusters
-            clusters: List[List[RawEvent]] = []
-            if events:
-                current_cluster = [events[0]]
-                for i in range(1, len(events)):
-                    prev_event = current_cluster[-1]
-                    curr_event = events[i]
-                    # 24 hour window
-                    if (curr_event.timestamp - prev_event.timestamp) <= timedelta(hours=24):
-                        current_cluster.append(curr_event)
-                    else:
-                        clusters.append(current_cluster)
-                        current_cluster = [curr_event]
-                clusters.append(current_cluster)
-
-            print(f"Project {project}: Formed {len(clusters)} clusters from {len(events)} events")
-
-            for cluster in clusters:
-                # Verification
-                confirmation = verification_agent.verify(cluster)
-                
-                if confirmation.confidence < 0.1:
-                    print(f"Skipping low confidence candidate for {project} (Score: {confirmation.confidence}) based on {len(cluster)} events")
-                    print(f"Reasoning: {confirmation.reasoning}")
-                    continue
-                
-                # Status
-                statuses = [status_agent.determine_status(e) for e in cluster]
-                final_status = statuses[0] 
-                
-                # Canonicalization
-                canonical = canonicalizer.canonicalize(cluster, confirmation, final_status, event_subtypes)
-                
-                print(f"\n[NEW UPGRADE DETECTED] {project.upper()}")
-                print(f"Headline: {canonical.headline}")
-                print(f"Status: {canonical.status.value}")
-                print(f"Confidence: {canonical.confidence}")
-                print("-" * 30)
-                
-                # 4. Output
-                output_manager.save_upgrade(canonical)
-
-        # Write all discovered upgrades to disk in one batch
-        output_manager.flush()
-
-        print("Cycle complete. Sleeping for 1 hour...")
-        time.sleep(3600)
+        due_watchers = scheduler.pop_due()
+        pushed = receiver.drain() if receiver else []
+        if not due_watchers and not pushed:
+            wait_for_work(scheduler.seconds_until_next())
+            continue
+
+        print(f"\n--- Polling Cycle ({len(due_watchers)}/{len(watchers)} sources due, {len(pushed)} pushed events) ---")
+
+        # Ingestion, analysis and output run as one streaming pipeline; each upgrade is written as soon as it is verified
+        try:
+            asyncio.run(pipeline.run(due_watchers, pushed))
+        except Exception as e:
+            print(f"Polling cycle failed: {e}")
+            # Watchers whose result was never handled would otherwise drop out of the schedule
+            for w in scheduler.requeue_missing(due_watchers):
+                try:
+                    state_manager.update_watcher_state(w.watcher_id, w.get_state())
+                except Exception as state_error:
+                    print(f"Error saving state for {w.watcher_id}: {state_error}")
+        if receiver:
+            # Feed discovery may have found new hubs; also renews expiring leases
+            receiver.renew()
+
+        # Watchers record validators only for polls whose events were handed off; persisting them
+        # after the cursors are saved means a restart can't pair a new validator with an old cursor
+        print(http_client.rate_limiter.report())
+        print(http_cache.report())
+        http_cache.reset_stats()
+        http_cache.save()
+        print(page_cache.report())
+        page_cache.reset_stats()
+        print(dedup_index.report())
+        dedup_index.reset_stats()
+        if llm_cache:
+            print(llm_cache.report())
+            llm_cache.reset_stats()
+        if llm_telemetry:
+            print(llm_telemetry.report())
+            llm_telemetry.flush()
+            print(snippets.report())
+            snippets.reset_stats()
+        if relevance_gate:
+            print(relevance_gate.report())
+            relevance_gate.reset_stats()
+
+        wait = scheduler.seconds_until_next()
+        print(f"Cycle complete. Next source due in {wait / 60:.0f} min...")
+        wait_for_work(wait)
 
 if __name__ == "__main__":
     try:
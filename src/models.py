@@ -1,8 +1,10 @@
+import json
+import zlib
 from enum import Enum
 from typing import List, Optional, Dict, Any
 from uuid import UUID, uuid4
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, model_validator
 
 # --- Enums ---
 
@@ -26,6 +28,7 @@ class ProjectConfig(BaseModel):
     blogs: List[str] = Field(default_factory=list)
     github_orgs: List[str] = Field(default_factory=list)
     governance: List[str] = Field(default_factory=list, description="Governance portal URLs")
+    keywords: Dict[str, List[str]] = Field(default_factory=dict, description="Extra heuristic keywords per category (crypto, economic, upgrade, deployed, approved)")
 
 class SourceRegistry(BaseModel):
     projects: Dict[str, ProjectConfig]
@@ -33,6 +36,15 @@ class SourceRegistry(BaseModel):
 # --- Ingestion Layer Models ---
 
 class RawEvent(BaseModel):
+    """
+    A single item from a watcher.
+
+    The source payload (feed entry, release JSON, tweet) is kept as given
+    while the event is classified. Events that stay around for clustering
+    and verification are `compact()`ed: the payload becomes zlib-compressed
+    JSON that `raw_data` decodes on access. Either way `raw_data` is part of
+    model_dump() and accepted by validation.
+    """
     event_id: UUID = Field(default_factory=uuid4)
     project: str
     source_type: SourceType
@@ -40,7 +52,52 @@ class RawEvent(BaseModel):
     text: str
     url: str
     timestamp: datetime
-    raw_data: Optional[Dict[str, Any]] = None
+    # The payload dict, or its compressed JSON after compact()
+    _raw: Any = PrivateAttr(default=None)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _split_raw_data(cls, data: Any, handler: Any) -> "RawEvent":
+        if not isinstance(data, dict) or "raw_data" not in data:
+            return handler(data)
+        data = dict(data)
+        raw_data = data.pop("raw_data")
+        event = handler(data)
+        event.raw_data = raw_data
+        return event
+
+    @classmethod
+    def trusted(cls, project: str, source_type: SourceType, author: str, text: str, url: str, timestamp: datetime, raw_data: Optional[Dict[str, Any]] = None) -> "RawEvent":
+        """
+        Builds an event from watcher output without running validation.
+        Callers must pass values of the declared types.
+        """
+        event = cls.model_construct(
+            event_id=uuid4(), project=project, source_type=source_type,
+            author=author, text=text, url=url, timestamp=timestamp
+        )
+        event._raw = raw_data
+        return event
+
+    @computed_field
+    @property
+    def raw_data(self) -> Optional[Dict[str, Any]]:
+        if isinstance(self._raw, bytes):
+            return json.loads(zlib.decompress(self._raw))
+        return self._raw
+
+    @raw_data.setter
+    def raw_data(self, value: Optional[Dict[str, Any]]):
+        self._raw = value
+
+    def compact(self):
+        """
+        Packs the payload into compressed JSON. Construction stays cheap;
+        only events that are kept after relevance classification pay for it.
+        """
+        if isinstance(self._raw, dict):
+            # default=str covers feedparser's time.struct_time and other non-JSON values
+            self._raw = zlib.compress(json.dumps(self._raw, default=str).encode(), 1)
 
 # --- Analysis Layer Models ---
 
@@ -54,6 +111,8 @@ class AffectedSubtype(BaseModel):
 class RelevanceSignal(BaseModel):
     is_relevant: bool
     affected_subtypes: List[AffectedSubtype] = Field(default_factory=list)
+    # Stand-in verdict (LLM call failed or its answer was unusable, or the cascade gate rejected the event); not stored for reuse by duplicates
+    provisional: bool = Field(default=False, exclude=True)
 
 class Evidence(BaseModel):
     type: str # "x", "github_release", "blog_post", "governance_tx"
@@ -0,0 +1,466 @@
+import os
+import time
+import asyncio
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from src.models import RawEvent, SourceRegistry, RelevanceSignal, UpgradeConfirmation, UpgradeStatus
+from src.ingestion.base import BaseWatcher
+from src.ingestion.engine import IngestionEngine, PollResult
+from src.rate_limit import RateLimitDeferred
+from src.scheduler import PollScheduler
+from src.data_manager import StateManager, OutputManager
+from src.analysis.dedup import NearDuplicateIndex
+
+# Events of a project within this window of each other form one upgrade candidate
+CLUSTER_WINDOW = timedelta(hours=24)
+SEEN_URLS_MAX = 20000
+
+class ProjectDone(NamedTuple):
+    """
+    Sent by the ingest stage once every due watcher of a project has finished.
+    `emitted` is how many events were sent for the project, so the cluster
+    stage knows when all of them have made it through relevance.
+    """
+    project: str
+    emitted: int
+
+class Classified(NamedTuple):
+    event: RawEvent
+    # None when the event was dropped (irrelevant or failed); it still counts towards `emitted`
+    signals: Optional[RelevanceSignal]
+
+class Candidate(NamedTuple):
+    project: str
+    cluster: List[RawEvent]
+
+class RecentEvent(NamedTuple):
+    """
+    A relevant event of an earlier cycle, kept for CLUSTER_WINDOW so events
+    of the same announcement polled in later cycles still join its cluster.
+    """
+    seen: float
+    event: RawEvent
+    subtypes: List[Any]
+
+class Verified(NamedTuple):
+    project: str
+    cluster: List[RawEvent]
+    confirmation: UpgradeConfirmation
+    status: UpgradeStatus
+
+def cluster_events(events: List[RawEvent]) -> List[List[RawEvent]]:
+    """
+    Time-based sliding window: sorted events join the current cluster while
+    they are within CLUSTER_WINDOW of its last event.
+    """
+    events = sorted(events, key=lambda x: x.timestamp)
+    clusters: List[List[RawEvent]] = []
+    for event in events:
+        if clusters and (event.timestamp - clusters[-1][-1].timestamp) <= CLUSTER_WINDOW:
+            clusters[-1].append(event)
+        else:
+            clusters.append([event])
+    return clusters
+
+class StreamingPipeline:
+    """
+    One polling cycle as a chain of stages connected by bounded queues:
+
+        ingest -> relevance -> cluster -> verify -> canonicalize -> output
+
+    Events are classified as soon as their watcher finishes, so LLM calls
+    overlap with slow HTTP sources. Clustering still needs every event of a
+    project in the cycle; a project is clustered (and verified) as soon as all
+    of its own watchers are done, not when the whole cycle is. Relevant events
+    of earlier cycles within CLUSTER_WINDOW are clustered again with the new
+    ones, since sources on different cadences report the same announcement in
+    different cycles. Full queues
+    make upstream stages wait, which bounds memory.
+    """
+    def __init__(self, registry: SourceRegistry, engine: IngestionEngine, scheduler: PollScheduler,
+                 state_manager: StateManager, output_manager: OutputManager,
+                 relevance_agent: Any, verification_agent: Any, status_agent: Any, canonicalizer: Any,
+                 dedup: Optional[NearDuplicateIndex] = None,
+                 queue_size: Optional[int] = None, workers: Optional[int] = None):
+        self.registry = registry
+        self.engine = engine
+        self.scheduler = scheduler
+        self.state_manager = state_manager
+        self.output_manager = output_manager
+        self.relevance_agent = relevance_agent
+        self.verification_agent = verification_agent
+        self.status_agent = status_agent
+        self.canonicalizer = canonicalizer
+        self.dedup = dedup
+        self.queue_size = queue_size or int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+        self.workers = workers or int(os.getenv("PIPELINE_WORKERS", "4"))
+        # Most events a relevance worker takes off its queue at once
+        self.batch_size = int(os.getenv("PIPELINE_BATCH_SIZE", "20"))
+        # Analysis gets its own threads so it never waits behind blocking polls
+        self.executor = ThreadPoolExecutor(max_workers=self.workers * 2)
+        # Recently emitted URLs, so an item that was pushed isn't processed again when it is polled (or vice versa)
+        self.seen_urls: "OrderedDict[str, None]" = OrderedDict()
+        # Relevant events of recent cycles per project, and the stored upgrade each (project, url) ended up in
+        self.recent: Dict[str, List[RecentEvent]] = {}
+        self.recent_upgrades: Dict[Tuple[str, str], str] = {}
+
+    def _first_sighting(self, event: RawEvent) -> bool:
+        if not event.url:
+            return True
+        if event.url in self.seen_urls:
+            self.seen_urls.move_to_end(event.url)
+            return False
+        self.seen_urls[event.url] = None
+        if len(self.seen_urls) > SEEN_URLS_MAX:
+            self.seen_urls.popitem(last=False)
+        return True
+
+    async def _call(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def _record_poll(self, result: PollResult) -> List[RawEvent]:
+        """
+        Scheduler, state and cursor bookkeeping for one finished watcher.
+        Returns the events to pass downstream.
+        """
+        watcher = result.watcher
+        if result.error is None:
+            watcher.record_activity(len(result.events))
+        interval = self.scheduler.record(watcher, result.events, result.error)
+        print(f"  [Schedule] {watcher.watcher_id} next poll in {interval / 60:.0f} min")
+        # Watcher state (e.g. feed discovery) can change even when a poll fails
+        self.state_manager.update_watcher_state(watcher.watcher_id, watcher.get_state())
+        if isinstance(result.error, RateLimitDeferred):
+            # Cursor stays put, so the next cycle picks up everything we skipped
+            print(f"[Deferred] {watcher.watcher_id}: {result.error}")
+            return []
+        if result.error:
+            print(f"Error polling {watcher.__class__.__name__}: {result.error}")
+            return []
+
+        new_events = result.events
+        if new_events:
+            print(f"Found {len(new_events)} events from {watcher.__class__.__name__} for {watcher.project_name} ({result.elapsed:.1f}s)")
+            latest_ts = max(e.timestamp for e in new_events)
+            watcher.update_cursor(latest_ts)
+            self.state_manager.update_cursor(watcher.watcher_id, latest_ts)
+        return new_events
+
+    async def _ingest(self, watchers: List[BaseWatcher], pushed: List[RawEvent], out: asyncio.Queue, results: List[PollResult]):
+        pending: Dict[str, int] = {}
+        emitted: Dict[str, int] = {}
+        for w in watchers:
+            pending[w.project_name] = pending.get(w.project_name, 0) + 1
+            emitted.setdefault(w.project_name, 0)
+
+        # Pushed events go first; projects with no due watcher are finished right after
+        for event in pushed:
+            if self._first_sighting(event):
+                await out.put(event)
+                emitted[event.project] = emitted.get(event.project, 0) + 1
+        for project in emitted:
+            if project not in pending:
+                await out.put(ProjectDone(project, emitted[project]))
+
+        async for result in self.engine.stream(watchers):
+            results.append(result)
+            project = result.watcher.project_name
+            for event in self._record_poll(result):
+                if not self._first_sighting(event):
+                    continue
+                await out.put(event)
+                emitted[project] += 1
+            pending[project] -= 1
+            if pending[project] == 0:
+                await out.put(ProjectDone(project, emitted[project]))
+
+    async def _relevance(self, inbox: asyncio.Queue, out: asyncio.Queue, event_subtypes: Dict[str, List[Any]]):
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            # Take whatever else is already queued so the agent can classify it as one batch
+            items = [item]
+            stop = False
+            while len(items) < self.batch_size and not inbox.empty():
+                extra = inbox.get_nowait()
+                if extra is None:
+                    stop = True
+                    break
+                items.append(extra)
+
+            events = [i for i in items if isinstance(i, RawEvent)]
+            # Every event and marker is forwarded even if analysis fails; the cluster stage counts them
+            try:
+                verdicts = await self._classify(events)
+            except Exception as e:
+                print(f"Analysis error: {e}")
+                verdicts = [None] * len(events)
+            try:
+                # Payloads are only read in full for classification; the events live on until the cycle ends
+                await self._call(lambda: [e.compact() for e in events])
+            except Exception as e:
+                print(f"Analysis error: {e}")
+            for event, signals in zip(events, verdicts):
+                if signals is not None and signals.is_relevant:
+                    event_subtypes[str(event.event_id)] = signals.affected_subtypes
+                elif signals is not None:
+                    print(f"[{event.project}] Event dropped by relevance agent (No direct token functionality impact found): {event.url}")
+                    signals = None
+                await out.put(Classified(event, signals))
+            for marker in items:
+                if isinstance(marker, ProjectDone):
+                    await out.put(marker)
+            if stop:
+                return
+
+    async def _classify(self, events: List[RawEvent]) -> List[Optional[RelevanceSignal]]:
+        """
+        Relevance verdicts for a batch of events. Near-duplicates of earlier
+        events, or of an earlier event in the same batch, reuse their
+        verdict; the rest go to the agent, one
+        `classify_many` call per project when the agent supports batching.
+        None means the event was dropped (duplicate already attached to a
+        stored upgrade, or classification failed).
+        """
+        results: List[Optional[RelevanceSignal]] = [None] * len(events)
+        fresh: List[int] = []
+        for i, event in enumerate(events):
+            try:
+                duplicate = await self._call(self.dedup.lookup, event) if self.dedup else None
+            except Exception as e:
+                # The index only saves work; classify the event as if it were new
+                print(f"Dedup lookup error: {e}")
+                duplicate = None
+            if duplicate is None:
+                fresh.append(i)
+                continue
+            try:
+                results[i] = await self._reuse_verdict(event, duplicate)
+            except Exception as e:
+                print(f"Analysis error: {e}")
+
+        # Reposts within this batch aren't in the index yet: only the first copy is classified
+        try:
+            firsts = await self._call(self.dedup.batch_duplicates, [events[i] for i in fresh]) if self.dedup else [None] * len(fresh)
+        except Exception as e:
+            print(f"Dedup lookup error: {e}")
+            firsts = [None] * len(fresh)
+        groups: Dict[str, List[int]] = {}
+        copies: Dict[int, List[int]] = {}
+        for i, first in zip(fresh, firsts):
+            if first is None:
+                groups.setdefault(events[i].project, []).append(i)
+            else:
+                copies.setdefault(fresh[first], []).append(i)
+
+        for project, indices in groups.items():
+            project_cfg = self.registry.projects.get(project)
+            group = [events[i] for i in indices]
+            try:
+                if hasattr(self.relevance_agent, "classify_many"):
+                    signals = await self._call(self.relevance_agent.classify_many, group, project_config=project_cfg)
+                else:
+                    signals = [await self._call(self.relevance_agent.classify, e, project_config=project_cfg) for e in group]
+            except Exception as e:
+                print(f"Analysis error: {e}")
+                continue
+            for i, signal in zip(indices, signals):
+                for j in [i] + copies.get(i, []):
+                    results[j] = signal
+                    if j != i:
+                        print(f"[Dedup] {events[j].url} duplicates {events[i].url}; reusing its verdict")
+                    # Stand-in verdicts (LLM failed, gate rejections) are not reused, so duplicates get classified properly later
+                    if self.dedup and signal is not None and not signal.provisional and (j == i or events[j].url != events[i].url):
+                        try:
+                            await self._call(self.dedup.add, events[j], signal)
+                        except Exception as e:
+                            print(f"Analysis error: {e}")
+        return results
+
+    async def _reuse_verdict(self, event: RawEvent, duplicate: Dict[str, Any]) -> Optional[RelevanceSignal]:
+        signals = self.dedup.signals_for(duplicate)
+        print(f"[Dedup] {event.url} duplicates {duplicate['url']}; reusing its verdict")
+        if event.url != duplicate["url"]:
+            await self._call(self.dedup.add, event, signals, upgrade_id=duplicate["upgrade_id"])
+        if duplicate["upgrade_id"] and signals.is_relevant:
+            # Already part of a published upgrade: add it as evidence rather than forming a new candidate
+            await self._call(self.output_manager.add_supporting_source, duplicate["upgrade_id"], event.url)
+            return None
+        return signals
+
+    def _remember(self, project: str, events: List[RawEvent], event_subtypes: Dict[str, List[Any]]) -> List[RecentEvent]:
+        """
+        Adds this cycle's relevant events of a project to the recent ones and
+        returns the earlier ones that are still within CLUSTER_WINDOW.
+        """
+        now = time.time()
+        earlier = [r for r in self.recent.get(project, []) if now - r.seen <= CLUSTER_WINDOW.total_seconds()]
+        self.recent[project] = earlier + [RecentEvent(now, e, event_subtypes.get(str(e.event_id), [])) for e in events]
+        urls = {r.event.url for r in self.recent[project]}
+        for key in [k for k in self.recent_upgrades if k[0] == project and k[1] not in urls]:
+            del self.recent_upgrades[key]
+        return earlier
+
+    async def _attach(self, project: str, upgrade_id: str, events: List[RawEvent]):
+        # Later sources of an already stored upgrade become its supporting evidence rather than a new candidate
+        for event in events:
+            await self._call(self.output_manager.add_supporting_source, upgrade_id, event.url)
+            self.recent_upgrades[(project, event.url)] = upgrade_id
+        if self.dedup:
+            await self._call(self.dedup.link, [e.url for e in events], project, upgrade_id)
+
+    async def _cluster(self, inbox: asyncio.Queue, out: asyncio.Queue, event_subtypes: Dict[str, List[Any]]):
+        relevant: Dict[str, List[RawEvent]] = {}
+        received: Dict[str, int] = {}
+        expected: Dict[str, int] = {}
+
+        async def finish(project: str):
+            events = relevant.pop(project, [])
+            received.pop(project, None)
+            expected.pop(project, None)
+            if not events:
+                return
+            try:
+                earlier = self._remember(project, events, event_subtypes)
+                clusters = cluster_events(events + [r.event for r in earlier])
+            except Exception as e:
+                print(f"Clustering error for {project}: {e}")
+                return
+            print(f"Project {project}: Formed {len(clusters)} clusters from {len(events)} events ({len(earlier)} from earlier cycles)")
+            new_ids = {e.event_id for e in events}
+            for r in earlier:
+                event_subtypes.setdefault(str(r.event.event_id), r.subtypes)
+            for cluster in clusters:
+                new = [e for e in cluster if e.event_id in new_ids]
+                if not new:
+                    continue
+                upgrade_id = next((self.recent_upgrades[(project, e.url)] for e in cluster if (project, e.url) in self.recent_upgrades), None)
+                if upgrade_id:
+                    try:
+                        await self._attach(project, upgrade_id, new)
+                    except Exception as e:
+                        print(f"Clustering error for {project}: {e}")
+                    continue
+                await out.put(Candidate(project, cluster))
+
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            try:
+                if isinstance(item, ProjectDone):
+                    project = item.project
+                    expected[project] = item.emitted
+                else:
+                    project = item.event.project
+                    received[project] = received.get(project, 0) + 1
+                    if item.signals is not None:
+                        relevant.setdefault(project, []).append(item.event)
+                # Relevance workers run in parallel, so the marker can overtake the project's last events
+                if project in expected and received.get(project, 0) >= expected[project]:
+                    await finish(project)
+            except Exception as e:
+                print(f"Clustering error: {e}")
+
+    async def _verify(self, inbox: asyncio.Queue, out: asyncio.Queue):
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            try:
+                confirmation = await self._call(self.verification_agent.verify, item.cluster)
+                if confirmation.confidence < 0.1:
+                    print(f"Skipping low confidence candidate for {item.project} (Score: {confirmation.confidence}) based on {len(item.cluster)} events")
+                    print(f"Reasoning: {confirmation.reasoning}")
+                    continue
+                statuses = [self.status_agent.determine_status(e, project_config=self.registry.projects.get(item.project)) for e in item.cluster]
+                await out.put(Verified(item.project, item.cluster, confirmation, statuses[0]))
+            except Exception as e:
+                print(f"Verification error for {item.project}: {e}")
+
+    async def _canonicalize(self, inbox: asyncio.Queue, out: asyncio.Queue, event_subtypes: Dict[str, List[Any]]):
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            try:
+                canonical = self.canonicalizer.canonicalize(item.cluster, item.confirmation, item.status, event_subtypes)
+                print(f"\n[NEW UPGRADE DETECTED] {item.project.upper()}")
+                print(f"Headline: {canonical.headline}")
+                print(f"Status: {canonical.status.value}")
+                print(f"Confidence: {canonical.confidence}")
+                print("-" * 30)
+            except Exception as e:
+                print(f"Canonicalization error for {item.project}: {e}")
+                continue
+            await out.put(canonical)
+
+    async def _output(self, inbox: asyncio.Queue):
+        while True:
+            canonical = await inbox.get()
+            if canonical is None:
+                try:
+                    await self._call(self.output_manager.flush)
+                except Exception as e:
+                    print(f"Output error: {e}")
+                return
+            try:
+                upgrade_id = await self._call(self.output_manager.save_upgrade, canonical)
+                # One upsert per burst of upgrades rather than per upgrade; nothing waits long, since idle queues flush at once
+                if inbox.empty() or len(self.output_manager.upgrades) >= self.batch_size:
+                    await self._call(self.output_manager.flush)
+                for url in [canonical.primary_source, *canonical.supporting_sources]:
+                    self.recent_upgrades[(canonical.project, url)] = upgrade_id
+                if self.dedup:
+                    await self._call(self.dedup.link, [canonical.primary_source, *canonical.supporting_sources], canonical.project, upgrade_id)
+            except Exception as e:
+                # Keep draining the queue, or upstream stages block on it and the cycle never ends
+                print(f"Output error for {canonical.project}: {e}")
+
+    async def run(self, watchers: List[BaseWatcher], pushed: Optional[List[RawEvent]] = None) -> List[PollResult]:
+        """
+        Runs one cycle for the due watchers plus any pushed events and returns
+        the poll results.
+        """
+        to_relevance: asyncio.Queue = asyncio.Queue(self.queue_size)
+        to_cluster: asyncio.Queue = asyncio.Queue(self.queue_size)
+        to_verify: asyncio.Queue = asyncio.Queue(self.queue_size)
+        to_canonical: asyncio.Queue = asyncio.Queue(self.queue_size)
+        to_output: asyncio.Queue = asyncio.Queue(self.queue_size)
+        event_subtypes: Dict[str, List[Any]] = {}
+        results: List[PollResult] = []
+
+        relevance = [asyncio.create_task(self._relevance(to_relevance, to_cluster, event_subtypes)) for _ in range(self.workers)]
+        cluster = asyncio.create_task(self._cluster(to_cluster, to_verify, event_subtypes))
+        verify = [asyncio.create_task(self._verify(to_verify, to_canonical)) for _ in range(self.workers)]
+        canonicalize = asyncio.create_task(self._canonicalize(to_canonical, to_output, event_subtypes))
+        output = asyncio.create_task(self._output(to_output))
+
+        cycle_start = time.monotonic()
+        try:
+            await self._ingest(watchers, pushed or [], to_relevance, results)
+            slowest = max((r.elapsed for r in results), default=0.0)
+            print(f"Ingestion finished in {time.monotonic() - cycle_start:.1f}s (slowest source {slowest:.1f}s)")
+
+            # Drain stage by stage: a None per consumer once everything upstream has finished
+            for _ in relevance:
+                await to_relevance.put(None)
+            await asyncio.gather(*relevance)
+            await to_cluster.put(None)
+            await cluster
+            for _ in verify:
+                await to_verify.put(None)
+            await asyncio.gather(*verify)
+            await to_canonical.put(None)
+            await canonicalize
+            await to_output.put(None)
+            await output
+        finally:
+            for task in [*relevance, cluster, *verify, canonicalize, output]:
+                task.cancel()
+        print(f"Pipeline finished in {time.monotonic() - cycle_start:.1f}s")
+        return results
@@ -0,0 +1,165 @@
+import os
+import time
+import hashlib
+import threading
+import urllib.parse
+from typing import Dict, Optional, Any
+
+class RateLimitDeferred(Exception):
+    """
+    Raised instead of making a request when the quota for a credential is
+    exhausted (or reserved for busier sources). The caller should give up for
+    this cycle without advancing its cursor and retry on the next one.
+    """
+    pass
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `rate` tokens are added per second up to `capacity`.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate: float, capacity: float):
+        with self.lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity
+            self.tokens = min(self.tokens, capacity)
+
+    def wait_time(self, amount: float = 1.0) -> float:
+        with self.lock:
+            self._refill()
+            if self.tokens >= amount:
+                return 0.0
+            if self.rate <= 0:
+                return float("inf")
+            return (amount - self.tokens) / self.rate
+
+    def acquire(self, amount: float = 1.0, max_wait: Optional[float] = None) -> bool:
+        """
+        Takes `amount` tokens, sleeping until they are available. Returns False
+        without taking anything if that would mean waiting longer than `max_wait`.
+        """
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = (amount - self.tokens) / self.rate if self.rate > 0 else float("inf")
+            if max_wait is not None and wait > max_wait:
+                return False
+            time.sleep(min(wait, 1.0))
+
+class ApiRateLimiter:
+    """
+    Per-credential scheduler for rate-limited APIs (GitHub, X).
+
+    Limits are learned from the `X-RateLimit-*` (GitHub) and `x-rate-limit-*`
+    (X) response headers: the remaining quota is spread evenly over the time
+    left until the reset. Once the quota drops below `reserve_fraction`, only
+    high-priority (frequently changing) sources may spend it. Callers that
+    would have to wait longer than `max_wait` get RateLimitDeferred.
+    """
+    X_HOSTS = {"api.twitter.com", "api.x.com"}
+    GITHUB_HOST = "api.github.com"
+    BURST = 10
+
+    def __init__(self, max_wait: Optional[float] = None, reserve_fraction: float = 0.1, reserve_priority: float = 0.5):
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv("RATE_LIMIT_MAX_WAIT", "30"))
+        self.reserve_fraction = reserve_fraction
+        self.reserve_priority = reserve_priority
+        self.lock = threading.Lock()
+        self.limits: Dict[str, Dict[str, Any]] = {}
+
+    def handles(self, url: str) -> bool:
+        host = urllib.parse.urlparse(url).hostname
+        return host == self.GITHUB_HOST or host in self.X_HOSTS
+
+    def _key(self, url: str, credential: Optional[str]) -> str:
+        parsed = urllib.parse.urlparse(url)
+        host = parsed.hostname or ""
+        path = parsed.path
+        # Each API meters some endpoints separately
+        if host == self.GITHUB_HOST:
+            resource = "graphql" if path.startswith("/graphql") else ("search" if path.startswith("/search") else "core")
+        elif host in self.X_HOSTS:
+            resource = "tweets" if path.endswith("/tweets") else "users"
+        else:
+            resource = "default"
+        if host in self.X_HOSTS:
+            host = "api.twitter.com"
+        # Never keep raw tokens around; "token abc" / "Bearer abc" / "abc" all map to the same credential
+        token = (credential or "").split()[-1] if credential else "anonymous"
+        digest = hashlib.sha256(token.encode()).hexdigest()[:12]
+        return f"{host}:{resource}:{digest}"
+
+    def acquire(self, url: str, credential: Optional[str] = None, priority: float = 1.0):
+        key = self._key(url, credential)
+        with self.lock:
+            state = self.limits.get(key)
+        if not state:
+            # Nothing learned yet; the first response will tell us the limits
+            return
+
+        now = time.time()
+        remaining, limit, reset = state["remaining"], state["limit"], state["reset"]
+        if reset and now < reset and remaining is not None:
+            if remaining <= 0:
+                wait = reset - now
+                if wait > self.max_wait:
+                    raise RateLimitDeferred(f"{key} exhausted, resets in {wait:.0f}s")
+                time.sleep(wait)
+                return
+            if limit and remaining < limit * self.reserve_fraction and priority < self.reserve_priority:
+                raise RateLimitDeferred(f"{key} below reserve ({remaining}/{limit}); deferring low-priority source")
+
+        if not state["bucket"].acquire(1, max_wait=self.max_wait):
+            raise RateLimitDeferred(f"{key} would need more than {self.max_wait:.0f}s to free a slot")
+
+    def observe(self, url: str, credential: Optional[str], headers: Any, status_code: int):
+        lower = {k.lower(): v for k, v in headers.items()}
+        limit = lower.get("x-ratelimit-limit") or lower.get("x-rate-limit-limit")
+        remaining = lower.get("x-ratelimit-remaining") or lower.get("x-rate-limit-remaining")
+        reset = lower.get("x-ratelimit-reset") or lower.get("x-rate-limit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            limit = int(limit) if limit is not None else None
+            remaining = int(remaining)
+            reset = float(reset)
+        except ValueError:
+            return
+        if status_code in (403, 429) and remaining > 0:
+            # Secondary limits report quota left but still reject; back off until reset
+            remaining = 0
+
+        # Spread what is left evenly over the rest of the window
+        window = max(1.0, reset - time.time())
+        rate = remaining / window
+        capacity = max(1.0, min(float(remaining), self.BURST))
+
+        key = self._key(url, credential)
+        with self.lock:
+            state = self.limits.get(key)
+            if state is None:
+                state = {"bucket": TokenBucket(rate, capacity)}
+                self.limits[key] = state
+            else:
+                state["bucket"].set_rate(rate, capacity)
+            state.update(limit=limit, remaining=remaining, reset=reset)
+
+    def report(self) -> str:
+        with self.lock:
+            parts = [f"{k.rsplit(':', 1)[0]} {s['remaining']}/{s['limit']}" for k, s in self.limits.items()]
+        return f"[Rate Limits] {', '.join(parts) if parts else 'no limits observed yet'}"
@@ -0,0 +1,109 @@
+import os
+import time
+import heapq
+import itertools
+from typing import Dict, List, Optional, Any
+from src.models import RawEvent
+from src.ingestion.base import BaseWatcher
+from src.rate_limit import RateLimitDeferred
+
+class PollScheduler:
+    """
+    Priority queue of watchers keyed by their next due time.
+
+    Each watcher's cadence is learned from its posting history: we keep an
+    EMA of the gap between published events and poll at a fraction of it,
+    clamped to [min_interval, max_interval]. A source that has been quiet for
+    longer than its usual gap drifts towards max_interval, and failures back
+    off exponentially. Sources covered by push notifications
+    (`push_until`) are polled at max_interval. The learned stats live in
+    `watcher.schedule` and are persisted with the rest of the watcher state.
+    """
+    # Poll this often relative to the typical gap between posts
+    GAP_FRACTION = 0.1
+    EMA_ALPHA = 0.3
+
+    def __init__(self, watchers: List[BaseWatcher], min_interval: Optional[float] = None, max_interval: Optional[float] = None, default_interval: Optional[float] = None):
+        self.min_interval = min_interval or float(os.getenv("POLL_MIN_INTERVAL", "300"))
+        self.max_interval = max_interval or float(os.getenv("POLL_MAX_INTERVAL", "14400"))
+        self.default_interval = default_interval or float(os.getenv("POLL_DEFAULT_INTERVAL", "3600"))
+        self._heap: List[Any] = []
+        self._seq = itertools.count()
+
+        # Everything is due on startup, same as the old fixed loop
+        now = time.time()
+        for w in watchers:
+            self.schedule_at(w, now)
+
+    def schedule_at(self, watcher: BaseWatcher, due: float):
+        heapq.heappush(self._heap, (due, next(self._seq), watcher))
+
+    def requeue_missing(self, watchers: List[BaseWatcher], now: Optional[float] = None) -> List[BaseWatcher]:
+        """
+        Re-queues watchers that were popped but never `record`ed (the cycle
+        failed before their result was handled), at min_interval from now.
+        Returns them.
+        """
+        queued = {id(entry[2]) for entry in self._heap}
+        missing = [w for w in watchers if id(w) not in queued]
+        due = (now or time.time()) + self.min_interval
+        for w in missing:
+            self.schedule_at(w, due)
+        return missing
+
+    def pop_due(self, now: Optional[float] = None) -> List[BaseWatcher]:
+        now = now or time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        if not self._heap:
+            return self.default_interval
+        return max(0.0, self._heap[0][0] - (now or time.time()))
+
+    def _interval(self, stats: Dict[str, Any], now: float) -> float:
+        # Push notifications cover this source; polling is only a safety net
+        if stats.get("push_until", 0) > now:
+            return self.max_interval
+        mean_gap = stats.get("mean_gap")
+        if mean_gap is None:
+            return self.default_interval
+        gap = mean_gap
+        last_event = stats.get("last_event_ts")
+        if last_event:
+            # Quiet for longer than usual: the posting rate has probably dropped
+            gap = max(gap, (now - last_event) * 0.5)
+        return min(self.max_interval, max(self.min_interval, gap * self.GAP_FRACTION))
+
+    def record(self, watcher: BaseWatcher, events: List[RawEvent], error: Optional[Exception] = None) -> float:
+        """
+        Updates the watcher's cadence from a poll result and re-queues it.
+        Returns the chosen interval in seconds.
+        """
+        now = time.time()
+        stats = watcher.schedule
+
+        if isinstance(error, RateLimitDeferred):
+            # Not the source's fault; retry at the normal cadence
+            interval = self._interval(stats, now)
+        elif error is not None:
+            stats["failures"] = stats.get("failures", 0) + 1
+            interval = min(self.max_interval, self._interval(stats, now) * (2 ** stats["failures"]))
+        else:
+            stats["failures"] = 0
+            last = stats.get("last_event_ts")
+            mean_gap = stats.get("mean_gap")
+            for ts in sorted(e.timestamp.timestamp() for e in events):
+                if last is not None and ts > last:
+                    gap = ts - last
+                    mean_gap = gap if mean_gap is None else (1 - self.EMA_ALPHA) * mean_gap + self.EMA_ALPHA * gap
+                last = ts if last is None else max(last, ts)
+            stats["last_event_ts"] = last
+            stats["mean_gap"] = mean_gap
+            interval = self._interval(stats, now)
+
+        stats["interval"] = round(interval)
+        self.schedule_at(watcher, now + interval)
+        return interval
@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+import pytest
+from src.ingestion.dates import date_from_text
+
+@pytest.mark.parametrize("text, expected", [
+    ("Posted January 5, 2024 by the team", datetime(2024, 1, 5, tzinfo=timezone.utc)),
+    ("Jan 5, 2024", datetime(2024, 1, 5, tzinfo=timezone.utc)),
+    ("Sept. 5, 2024", datetime(2024, 9, 5, tzinfo=timezone.utc)),
+    ("Sep 5 2024", datetime(2024, 9, 5, tzinfo=timezone.utc)),
+    ("June 30, 2023", datetime(2023, 6, 30, tzinfo=timezone.utc)),
+    # Words that merely start with a month abbreviation
+    ("Marketing 10, 2024", None),
+    ("Decentralized 3, 2024", None),
+    ("Mayhem 5, 2023", None),
+    ("February 30, 2024", None),
+])
+def test_date_from_text(text, expected):
+    assert date_from_text(text) == expected
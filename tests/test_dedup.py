@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from src.models import RawEvent, RelevanceSignal, SourceType
+from src.analysis.dedup import NearDuplicateIndex
+
+POST = "Uniswap v4 launches today on mainnet with hooks, singleton pools, flash accounting and native ETH support for every pool"
+
+def event(text: str, url: str = "https://blog.uniswap.org/v4") -> RawEvent:
+    return RawEvent(project="uniswap", source_type=SourceType.BLOG, author="", text=text, url=url, timestamp=datetime.now(timezone.utc))
+
+def test_edited_post_is_not_matched_by_url(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / "dedup.sqlite"))
+    index.add(event("Short teaser"), RelevanceSignal(is_relevant=False))
+    assert index.lookup(event("Short teaser")) is not None
+    assert index.lookup(event(POST)) is None
+
+def test_reposts_in_the_same_batch_are_matched(tmp_path):
+    index = NearDuplicateIndex(path=str(tmp_path / "dedup.sqlite"))
+    batch = [event(POST), event("Unrelated"), event(POST + " (repost)", url="https://x.com/Uniswap/status/1")]
+    assert index.batch_duplicates(batch) == [None, None, 0]
@@ -0,0 +1,14 @@
+from datetime import datetime, timezone
+from src.models import RawEvent, SourceType
+
+def test_raw_data_survives_serialization():
+    event = RawEvent(project="uniswap", source_type=SourceType.BLOG, author="", text="t", url="u",
+                     timestamp=datetime.now(timezone.utc), raw_data={"article_text": "body"})
+    assert event.model_dump()["raw_data"] == {"article_text": "body"}
+    assert RawEvent.model_validate(event.model_dump()).raw_data == {"article_text": "body"}
+
+def test_compacted_payload_decodes():
+    event = RawEvent.trusted("uniswap", SourceType.X, "@uniswap", "t", "u", datetime.now(timezone.utc), {"id": "1"})
+    event.compact()
+    assert event.raw_data == {"id": "1"}
+    assert RawEvent.model_validate_json(event.model_dump_json()).raw_data == {"id": "1"}
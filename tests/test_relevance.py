@@ -0,0 +1,25 @@
+from datetime import datetime
+import pytest
+from src.models import RawEvent, SourceType
+from src.analysis.relevance import RelevanceClassifierAgent, CascadeRelevanceAgent
+
+def event(text: str, project: str = "uniswap") -> RawEvent:
+    return RawEvent(project=project, source_type=SourceType.BLOG, author="", text=text, url="", timestamp=datetime.now())
+
+@pytest.mark.parametrize("text, project", [
+    ("Uniswap v4 is live", "uniswap"),
+    ("Introducing Uniswap v4", "uniswap"),
+    ("EigenLayer slashing is now live on mainnet", "eigenlayer"),
+    ("New fee tier for tokens", "arbitrum"),
+])
+def test_default_gate_passes_what_classify_accepts(text, project):
+    agent = RelevanceClassifierAgent()
+    assert agent.classify(event(text, project)).is_relevant
+    assert CascadeRelevanceAgent(agent, llm=None)._passes(event(text, project))
+
+def test_explainers_are_rejected_by_the_gate():
+    agent = RelevanceClassifierAgent()
+    explainer = event("What is Slippage?: Slippage is the difference between the price you expect and the price you get when swapping tokens.")
+    announcement = event("Slippage protection: Slippage is the difference between the price you expect and the price you get when swapping tokens.")
+    assert agent.score(explainer) == agent.score(announcement) / 2
+    assert not CascadeRelevanceAgent(agent, llm=None)._passes(explainer)
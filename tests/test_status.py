@@ -0,0 +1,21 @@
+from datetime import datetime
+import pytest
+from src.models import RawEvent, SourceType, UpgradeStatus
+from src.analysis.status import UpgradeStatusAgent
+
+def event(text: str) -> RawEvent:
+    return RawEvent(project="uniswap", source_type=SourceType.BLOG, author="", text=text, url="", timestamp=datetime.now())
+
+@pytest.mark.parametrize("text, status", [
+    ("Uniswap v4 is live", UpgradeStatus.DEPLOYED_MAINNET),
+    ("EigenLayer slashing is now live on mainnet", UpgradeStatus.DEPLOYED_MAINNET),
+    ("The upgrade will be live on mainnet next week", UpgradeStatus.PROPOSAL_ONLY),
+    ("The upgrade has not been deployed yet", UpgradeStatus.PROPOSAL_ONLY),
+    # Deployment wording in proposals describes the proposed action
+    ("Proposal: Deploy Uniswap v3 on Linea mainnet", UpgradeStatus.PROPOSAL_ONLY),
+    ("[Temp Check] Proposal to activate the fee switch on mainnet", UpgradeStatus.PROPOSAL_ONLY),
+    ("We propose to deploy v3 on mainnet", UpgradeStatus.PROPOSAL_ONLY),
+    ("The proposal passed with 40M votes in favor", UpgradeStatus.APPROVED_NOT_DEPLOYED),
+])
+def test_determine_status(text, status):
+    assert UpgradeStatusAgent().determine_status(event(text)) == status